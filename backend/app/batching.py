@@ -0,0 +1,124 @@
+"""
+Asynchronous batching of flow executions
+
+Executions for the same (flow_id, model_id) that arrive within a short window
+are coalesced and handed to the dispatcher as one batch, so the per-call
+overhead of queueing and invoking Modal is paid once per batch.
+"""
+import asyncio
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+BatchKey = Tuple[str, str]
+# Returns one result for the whole batch, or a list with one result (or
+# exception) per item
+Dispatcher = Callable[[str, str, List[Dict[str, Any]]], Any]
+
+class BatchRouter:
+    """Routes executions into per-(flow, model) queues and flushes them in batches"""
+
+    def __init__(
+        self,
+        dispatch: Dispatcher,
+        max_batch_size: int = 32,
+        max_wait_ms: int = 20,
+        dispatch_timeout: float = 10.0,
+        idle_timeout: float = 60.0,
+    ):
+        self.dispatch = dispatch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        # Callers stop waiting on a dispatch after this many seconds
+        self.dispatch_timeout = dispatch_timeout
+        # A key's queue and flush loop are dropped after this long without items
+        self.idle_timeout = idle_timeout
+        self._queues: Dict[BatchKey, asyncio.Queue] = {}
+        self._flushers: Dict[BatchKey, asyncio.Task] = {}
+
+    async def submit(self, flow_id: str, model_id: str, item: Dict[str, Any]) -> Any:
+        """Queue an item and wait until the batch containing it has been dispatched"""
+        key = (flow_id, model_id)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = asyncio.Queue()
+            self._flushers[key] = asyncio.create_task(self._flush_loop(key, queue))
+
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait((item, future))
+        return await future
+
+    async def stop(self):
+        """Cancel the flush loops and fail anything still queued"""
+        for task in self._flushers.values():
+            task.cancel()
+        await asyncio.gather(*self._flushers.values(), return_exceptions=True)
+
+        for queue in self._queues.values():
+            while not queue.empty():
+                _, future = queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Batch router is shutting down"))
+
+        self._flushers.clear()
+        self._queues.clear()
+
+    async def _flush_loop(self, key: BatchKey, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                batch = [await asyncio.wait_for(queue.get(), self.idle_timeout)]
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    # Idle: forget the key; the next submit starts a new loop.
+                    # There is no await between this check and the removal,
+                    # so no item can slip in between
+                    self._queues.pop(key, None)
+                    self._flushers.pop(key, None)
+                    return
+                continue
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            items = [item for item, _ in batch]
+            try:
+                # The dispatch itself can't be interrupted, but a slow broker
+                # call no longer holds every caller in the batch
+                result = await asyncio.wait_for(
+                    run_in_threadpool(self.dispatch, key[0], key[1], items),
+                    self.dispatch_timeout,
+                )
+            except asyncio.TimeoutError:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(
+                            TimeoutError(f"Dispatch of {len(batch)} executions timed out after {self.dispatch_timeout}s")
+                        )
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Batch router is shutting down"))
+                raise
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                # A list with one entry per item answers each caller separately;
+                # entries that are exceptions fail only that caller
+                results = result if isinstance(result, list) and len(result) == len(batch) else [result] * len(batch)
+                for (_, future), item_result in zip(batch, results):
+                    if future.done():
+                        continue
+                    if isinstance(item_result, BaseException):
+                        future.set_exception(item_result)
+                    else:
+                        future.set_result(item_result)
@@ -0,0 +1,72 @@
+"""
+Compiled numeric kernels for flow executions
+"""
+import numba
+import numpy as np
+
+@numba.njit(parallel=True, cache=True, fastmath=True)
+def cluster_cosine(emb: np.ndarray, k: int, thr: float, max_iter: int = 20) -> np.ndarray:
+    """
+    Spherical k-means over an (N, D) float32 embedding matrix.
+
+    Returns the cluster index of every row, or -1 for rows whose cosine
+    similarity to their closest centroid is below ``thr``.
+    """
+    n, d = emb.shape
+    k = min(k, n)
+    labels = np.full(n, -1, dtype=np.int64)
+    if k == 0:
+        return labels
+
+    # Normalize rows so a dot product is the cosine similarity
+    points = np.empty((n, d), dtype=np.float32)
+    for i in numba.prange(n):
+        norm = np.sqrt(np.sum(emb[i] * emb[i]))
+        if norm > 0:
+            points[i] = emb[i] / norm
+        else:
+            points[i] = 0.0
+
+    # Deterministic init: evenly spaced rows
+    centroids = np.empty((k, d), dtype=np.float32)
+    for c in range(k):
+        centroids[c] = points[(c * n) // k]
+
+    best_sim = np.empty(n, dtype=np.float32)
+    for _ in range(max_iter):
+        changed = 0
+        for i in numba.prange(n):
+            best = 0
+            best_score = -2.0
+            for c in range(k):
+                score = 0.0
+                for j in range(d):
+                    score += points[i, j] * centroids[c, j]
+                if score > best_score:
+                    best_score = score
+                    best = c
+            best_sim[i] = best_score
+            if labels[i] != best:
+                labels[i] = best
+                changed += 1
+
+        if changed == 0:
+            break
+
+        sums = np.zeros((k, d), dtype=np.float32)
+        for i in range(n):
+            sums[labels[i]] += points[i]
+        for c in range(k):
+            norm = np.sqrt(np.sum(sums[c] * sums[c]))
+            if norm > 0:
+                centroids[c] = sums[c] / norm
+
+    for i in numba.prange(n):
+        if best_sim[i] < thr:
+            labels[i] = -1
+
+    return labels
+
+def warmup():
+    """Compile the kernels ahead of the first real execution"""
+    cluster_cosine(np.eye(4, dtype=np.float32), 2, 0.0)
@@ -0,0 +1,148 @@
+"""
+Celery tasks for CLOSED AI flow executions
+
+Run a worker with:
+    celery -A app.tasks worker --loglevel=info
+"""
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+from celery import Celery
+from celery.signals import worker_process_init
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Modal "run-flow" web endpoint (see packages/infra/modal/deploy.py)
+MODAL_RUN_FLOW_URL = os.getenv("MODAL_RUN_FLOW_URL")
+MODAL_RUN_FLOW_BATCH_URL = os.getenv("MODAL_RUN_FLOW_BATCH_URL")
+
+celery_app = Celery("frontand", broker=REDIS_URL, backend=REDIS_URL)
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    # Executions are long-running; don't let one worker hoard queued jobs
+    worker_prefetch_multiplier=1,
+    # Matches the default FlowRuntime.timeout
+    task_time_limit=300,
+)
+
+@worker_process_init.connect
+def _warmup_kernels(**kwargs):
+    # Compile the numeric kernels before the first execution lands on this process
+    from app.kernels import warmup
+    warmup()
+
+_modal_http: Optional[httpx.Client] = None
+
+def get_modal_http() -> httpx.Client:
+    """Get the worker's shared HTTP client for Modal, creating it on first use"""
+    global _modal_http
+    if _modal_http is None:
+        _modal_http = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=200),
+            timeout=httpx.Timeout(300.0, connect=5.0),
+        )
+    return _modal_http
+
+def cluster_embeddings(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Cluster precomputed keyword embeddings with the compiled kernel"""
+    # numba is only loaded by workers; the API imports this module just to enqueue
+    from app.kernels import cluster_cosine
+    
+    embeddings = np.asarray(inputs["embeddings"], dtype=np.float32)
+    keywords = inputs.get("keywords") or [str(i) for i in range(len(embeddings))]
+    labels = cluster_cosine(
+        embeddings,
+        int(inputs.get("num_clusters", 5)),
+        float(inputs.get("similarity_threshold", 0.7)),
+    )
+
+    clusters: Dict[int, List[str]] = {}
+    for keyword, label in zip(keywords, labels.tolist()):
+        if label >= 0:
+            clusters.setdefault(label, []).append(keyword)
+
+    return {
+        "clusters": [
+            {"id": i + 1, "keywords": cluster_keywords}
+            for i, cluster_keywords in enumerate(clusters.values())
+        ],
+        "total_keywords": len(keywords),
+    }
+
+@celery_app.task(name="frontand.process_execution")
+def process_execution(execution_id: str, request: Dict[str, Any]):
+    """Process a flow execution on a worker"""
+    try:
+        if request["flow_id"] == "cluster-keywords" and "embeddings" in request["inputs"]:
+            # Embeddings supplied by the caller: cluster in-process, no Modal round trip
+            outputs = cluster_embeddings(request["inputs"])
+            print(f"Clustered {outputs['total_keywords']} keywords for execution {execution_id}")
+        elif MODAL_RUN_FLOW_URL:
+            response = get_modal_http().post(
+                MODAL_RUN_FLOW_URL,
+                json={
+                    "flow_id": request["flow_id"],
+                    "inputs": request["inputs"],
+                    "metadata": {
+                        "execution_id": execution_id,
+                        "model_id": request["model_id"],
+                    },
+                },
+            )
+            response.raise_for_status()
+        else:
+            # Simulate processing time
+            time.sleep(2)
+
+        # In production, this would also:
+        # 1. Save results to database
+        # 2. Update execution status
+
+        print(f"Processed execution {execution_id} for flow {request['flow_id']}")
+    except Exception as e:
+        print(f"Error processing execution {execution_id}: {e}")
+
+@celery_app.task(name="frontand.process_execution_batch")
+def process_execution_batch(flow_id: str, model_id: str, executions: List[Dict[str, Any]]):
+    """Process a batch of executions of the same flow and model"""
+    if not MODAL_RUN_FLOW_BATCH_URL:
+        for execution in executions:
+            process_execution(
+                execution["execution_id"],
+                {"flow_id": flow_id, "model_id": model_id, "inputs": execution["inputs"]},
+            )
+        return
+
+    try:
+        response = get_modal_http().post(
+            MODAL_RUN_FLOW_BATCH_URL,
+            json={
+                "flow_id": flow_id,
+                "executions": [
+                    {
+                        "inputs": execution["inputs"],
+                        "metadata": {
+                            "execution_id": execution["execution_id"],
+                            "model_id": model_id,
+                        },
+                    }
+                    for execution in executions
+                ],
+            },
+        )
+        response.raise_for_status()
+
+        # In production, this would also save each result and update its execution status
+
+        print(f"Processed {len(executions)} executions for flow {flow_id}")
+    except Exception as e:
+        print(f"Error processing batch of {len(executions)} executions for flow {flow_id}: {e}")
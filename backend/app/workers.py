@@ -0,0 +1,14 @@
+"""
+Gunicorn worker class for the CLOSED AI backend
+"""
+from uvicorn.workers import UvicornWorker
+
+try:
+    import uvloop  # noqa: F401
+    LOOP = "uvloop"
+except ImportError:
+    LOOP = "auto"
+
+class APIWorker(UvicornWorker):
+    """Uvicorn worker pinned to uvloop (where installed) and httptools, without per-request access logs"""
+    CONFIG_KWARGS = {"loop": LOOP, "http": "httptools", "access_log": False}
@@ -15,11 +15,25 @@ class Settings(BaseSettings):
     modal_token_id: str = ""
     modal_token_secret: str = ""
     
+    # Execution batching
+    batch_max_size: int = 32
+    batch_max_wait_ms: int = 20
+    batch_dispatch_timeout_s: float = 10.0
+    batch_idle_timeout_s: float = 60.0
+    
+    # Flow search: word-prefix inverted index instead of substring scans
+    search_term_index: bool = True
+    
     # Application Settings
     environment: str = "development"
     debug: bool = True
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+    # Gunicorn workers outside development. The flow catalog is still held in
+    # process memory, so flows created on one worker would be missing on the
+    # others; keep this at 1 until the catalog is read from the flows table.
+    # 0 starts one worker per core.
+    api_workers: int = 1
     
     class Config:
         env_file = ".env"
@@ -1,20 +1,53 @@
 #!/usr/bin/env python3
 """
 Simple script to run the CLOSED AI backend server
+
+Development runs a single auto-reloading Uvicorn process. Any other
+environment execs into Gunicorn with settings.api_workers Uvicorn workers.
 """
+import os
 import uvicorn
-from app.main import app
+from config import settings
+
+try:
+    import uvloop  # noqa: F401
+    LOOP = "uvloop"
+except ImportError:  # not available on Windows
+    LOOP = "auto"
+
+def run_development():
+    uvicorn.run(
+        "app.main:app",
+        host=settings.api_host,
+        port=settings.api_port,
+        loop=LOOP,
+        http="httptools",
+        reload=True,
+        log_level="info"
+    )
+
+def run_production():
+    # Async workers each serve many requests, so one per core is enough
+    workers = settings.api_workers or os.cpu_count() or 1
+    os.execvp("gunicorn", [
+        "gunicorn",
+        "app.main:app",
+        "-k", "app.workers.APIWorker",
+        "-w", str(workers),
+        "--bind", f"{settings.api_host}:{settings.api_port}",
+        "--timeout", "120",
+        "--graceful-timeout", "30",
+        "--keep-alive", "5",
+    ])
 
 if __name__ == "__main__":
     print("🚀 Starting CLOSED AI Backend Server...")
-    print("📖 API Documentation: http://localhost:8000/docs")
-    print("🔗 API Base URL: http://localhost:8000")
+    print(f"📖 API Documentation: http://localhost:{settings.api_port}/docs")
+    print(f"🔗 API Base URL: http://localhost:{settings.api_port}")
+    print(f"🌍 Environment: {settings.environment}")
     print("")
     
-    uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    ) 
\ No newline at end of file
+    if settings.environment == "development":
+        run_development()
+    else:
+        run_production()
@@ -5,9 +5,92 @@ AI-powered keyword extraction and clustering from text
 
 import re
 import json
+from collections import Counter
 from typing import Dict, List, Any
+from lingua import Language, LanguageDetectorBuilder
 from closedai import flow, llm_call
 
+# Words of 3+ letters, used by the fallback keyword extraction
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+_JSON_DECODER = json.JSONDecoder()
+
+LANGUAGE_NAMES = {
+    "en": "English",
+    "es": "Spanish",
+    "fr": "French",
+    "de": "German",
+    "it": "Italian",
+    "pt": "Portuguese",
+    "nl": "Dutch"
+}
+
+# Detector limited to the supported languages; too-close calls come back as None
+_LINGUA_CODES = {
+    Language.ENGLISH: "en",
+    Language.SPANISH: "es",
+    Language.FRENCH: "fr",
+    Language.GERMAN: "de",
+    Language.ITALIAN: "it",
+    Language.PORTUGUESE: "pt",
+    Language.DUTCH: "nl"
+}
+_LANGUAGE_DETECTOR = (
+    LanguageDetectorBuilder.from_languages(*_LINGUA_CODES)
+    .with_minimum_relative_distance(0.25)
+    .build()
+)
+
+# Structured-output schemas, so the model replies with parseable JSON
+KEYWORDS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "keywords",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "keywords": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "keyword": {"type": "string"},
+                            "relevance": {"type": "number"},
+                            "category": {"type": "string"}
+                        },
+                        "required": ["keyword", "relevance", "category"]
+                    }
+                }
+            },
+            "required": ["keywords"]
+        }
+    }
+}
+
+CLUSTERS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "clusters",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "clusters": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "theme": {"type": "string"},
+                            "keywords": {"type": "array", "items": {"type": "string"}},
+                            "explanation": {"type": "string"}
+                        },
+                        "required": ["theme", "keywords", "explanation"]
+                    }
+                }
+            },
+            "required": ["clusters"]
+        }
+    }
+}
+
 @flow(gpu="l4", timeout=300, memory=2048)
 async def run(inputs: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -61,48 +144,17 @@ async def run(inputs: Dict[str, Any]) -> Dict[str, Any]:
 async def detect_language(text: str) -> str:
     """Detect the language of the input text"""
     
-    prompt = f"""
-    Detect the language of the following text. Return only the language code (en, es, fr, de, it, pt, nl, etc.).
-    
-    Text: {text[:500]}...
-    
-    Language code:
-    """
+    prediction = _LANGUAGE_DETECTOR.detect_language_of(text[:2000])
     
-    try:
-        response = await llm_call(
-            model_id="llama3-8b-q4",
-            prompt=prompt,
-            max_tokens=10,
-            temperature=0.1
-        )
-        
-        detected = response.content.strip().lower()
-        
-        # Validate against supported languages
-        supported = ["en", "es", "fr", "de", "it", "pt", "nl"]
-        if detected in supported:
-            return detected
-        else:
-            return "en"  # Default to English
-            
-    except Exception:
-        return "en"  # Default to English on error
+    # Unreliable predictions are None
+    if prediction is not None:
+        return _LINGUA_CODES[prediction]
+    return "en"  # Default to English
 
 async def extract_keywords(text: str, language: str) -> List[Dict[str, Any]]:
     """Extract keywords from text using AI"""
     
-    language_names = {
-        "en": "English",
-        "es": "Spanish", 
-        "fr": "French",
-        "de": "German",
-        "it": "Italian",
-        "pt": "Portuguese",
-        "nl": "Dutch"
-    }
-    
-    lang_name = language_names.get(language, "English")
+    lang_name = LANGUAGE_NAMES.get(language, "English")
     
     prompt = f"""
     Extract the most important keywords and phrases from the following {lang_name} text. 
@@ -112,19 +164,21 @@ async def extract_keywords(text: str, language: str) -> List[Dict[str, Any]]:
     2. A relevance score (0-10) 
     3. A brief category/theme
     
-    Return the results as a JSON array with this structure:
-    [
-        {{
-            "keyword": "example keyword",
-            "relevance": 8.5,
-            "category": "theme"
-        }}
-    ]
+    Return the results as a JSON object with this structure:
+    {{
+        "keywords": [
+            {{
+                "keyword": "example keyword",
+                "relevance": 8.5,
+                "category": "theme"
+            }}
+        ]
+    }}
     
     Text to analyze:
     {text}
     
-    JSON array of keywords:
+    JSON object of keywords:
     """
     
     try:
@@ -132,12 +186,11 @@ async def extract_keywords(text: str, language: str) -> List[Dict[str, Any]]:
             model_id="llama3-8b-q4",
             prompt=prompt,
             max_tokens=800,
-            temperature=0.3
+            temperature=0.3,
+            response_format=KEYWORDS_RESPONSE_FORMAT
         )
         
-        # Extract JSON from response
-        json_text = extract_json_from_text(response.content)
-        keywords = json.loads(json_text)
+        keywords = parse_json_items(response.content, "keywords")
         
         # Validate and clean keywords
         cleaned_keywords = []
@@ -153,13 +206,7 @@ async def extract_keywords(text: str, language: str) -> List[Dict[str, Any]]:
         
     except Exception as e:
         # Fallback: simple keyword extraction
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-        word_freq = {}
-        for word in words:
-            word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # Get top words
-        top_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:20]
+        top_words = Counter(_WORD_RE.findall(text.lower())).most_common(20)
         
         return [
             {
@@ -185,6 +232,20 @@ async def cluster_keywords(keywords: List[Dict[str, Any]], num_clusters: int, mi
             for i, kw in enumerate(keywords)
         ]
     
+    # Degenerate cases need no model call
+    categories = Counter(kw["category"] for kw in keywords)
+    if len(categories) <= 1:
+        return _cluster_by_category(keywords, num_clusters, min_keywords)
+    if num_clusters == 1:
+        theme = categories.most_common(1)[0][0]
+        return [{
+            "cluster_id": 0,
+            "theme": theme,
+            "keywords": [kw["keyword"] for kw in keywords],
+            "relevance_scores": [kw["relevance"] for kw in keywords],
+            "explanation": "All extracted keywords"
+        }]
+    
     keywords_text = ", ".join([kw["keyword"] for kw in keywords])
     
     prompt = f"""
@@ -197,16 +258,18 @@ async def cluster_keywords(keywords: List[Dict[str, Any]], num_clusters: int, mi
     2. The keywords that belong to this cluster
     3. A brief explanation of why these keywords are grouped together
     
-    Return the results as a JSON array with this structure:
-    [
-        {{
-            "theme": "cluster theme",
-            "keywords": ["keyword1", "keyword2", "keyword3"],
-            "explanation": "brief explanation"
-        }}
-    ]
+    Return the results as a JSON object with this structure:
+    {{
+        "clusters": [
+            {{
+                "theme": "cluster theme",
+                "keywords": ["keyword1", "keyword2", "keyword3"],
+                "explanation": "brief explanation"
+            }}
+        ]
+    }}
     
-    JSON array of clusters:
+    JSON object of clusters:
     """
     
     try:
@@ -214,12 +277,11 @@ async def cluster_keywords(keywords: List[Dict[str, Any]], num_clusters: int, mi
             model_id="llama3-8b-q4",
             prompt=prompt,
             max_tokens=1000,
-            temperature=0.4
+            temperature=0.4,
+            response_format=CLUSTERS_RESPONSE_FORMAT
         )
         
-        # Extract JSON from response
-        json_text = extract_json_from_text(response.content)
-        clusters_data = json.loads(json_text)
+        clusters_data = parse_json_items(response.content, "clusters")
         
         # Process clusters and add relevance scores
         clusters = []
@@ -248,40 +310,32 @@ async def cluster_keywords(keywords: List[Dict[str, Any]], num_clusters: int, mi
         
     except Exception as e:
         # Fallback: simple category-based clustering
-        categories = {}
-        for kw in keywords:
-            cat = kw["category"]
-            if cat not in categories:
-                categories[cat] = []
-            categories[cat].append(kw)
-        
-        clusters = []
-        for i, (theme, kws) in enumerate(categories.items()):
-            if len(kws) >= min_keywords:
-                clusters.append({
-                    "cluster_id": i,
-                    "theme": theme,
-                    "keywords": [kw["keyword"] for kw in kws],
-                    "relevance_scores": [kw["relevance"] for kw in kws],
-                    "explanation": f"Keywords related to {theme}"
-                })
-        
-        return clusters[:num_clusters]
+        return _cluster_by_category(keywords, num_clusters, min_keywords)
+
+def _cluster_by_category(keywords: List[Dict[str, Any]], num_clusters: int, min_keywords: int) -> List[Dict[str, Any]]:
+    """Group keywords by their extracted category"""
+    
+    categories = {}
+    for kw in keywords:
+        categories.setdefault(kw["category"], []).append(kw)
+    
+    clusters = []
+    for i, (theme, kws) in enumerate(categories.items()):
+        if len(kws) >= min_keywords:
+            clusters.append({
+                "cluster_id": i,
+                "theme": theme,
+                "keywords": [kw["keyword"] for kw in kws],
+                "relevance_scores": [kw["relevance"] for kw in kws],
+                "explanation": f"Keywords related to {theme}"
+            })
+    
+    return clusters[:num_clusters]
 
 async def generate_summary(text: str, clusters: List[Dict[str, Any]], language: str) -> str:
     """Generate a summary of the keyword clustering analysis"""
     
-    language_names = {
-        "en": "English",
-        "es": "Spanish", 
-        "fr": "French",
-        "de": "German",
-        "it": "Italian",
-        "pt": "Portuguese",
-        "nl": "Dutch"
-    }
-    
-    lang_name = language_names.get(language, "English")
+    lang_name = LANGUAGE_NAMES.get(language, "English")
     
     clusters_text = []
     for cluster in clusters:
@@ -317,25 +371,42 @@ async def generate_summary(text: str, clusters: List[Dict[str, Any]], language:
     except Exception:
         return f"Analysis identified {len(clusters)} main themes from the provided text, covering topics like {', '.join([c['theme'] for c in clusters[:3]])}."
 
+def parse_json_items(content: str, key: str) -> List[Any]:
+    """The list under key in a structured reply, scraping the text only if the model ignored the schema"""
+    
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        return json.loads(extract_json_from_text(content))
+    
+    if isinstance(data, dict):
+        return data.get(key, [])
+    return data if isinstance(data, list) else []
+
 def extract_json_from_text(text: str) -> str:
     """Extract JSON array from text response"""
     
-    # Try to find JSON array in the text
     text = text.strip()
     
-    # Find the first [ and last ]
+    # Decode the first well-formed JSON array in the text, or failing that the
+    # first object. raw_decode respects strings and escapes, so brackets inside
+    # a rationale don't throw the match off
+    for opener in "[{":
+        start = text.find(opener)
+        while start != -1:
+            try:
+                value, _ = _JSON_DECODER.raw_decode(text, start)
+            except json.JSONDecodeError:
+                start = text.find(opener, start + 1)
+                continue
+            return json.dumps(value if isinstance(value, list) else [value])
+    
+    # Last resort: the outermost [ ... ] span, for output that isn't quite valid JSON
     start = text.find('[')
     end = text.rfind(']')
     
     if start != -1 and end != -1 and end > start:
         return text[start:end+1]
     
-    # If no array found, try to find JSON object
-    start = text.find('{')
-    end = text.rfind('}')
-    
-    if start != -1 and end != -1 and end > start:
-        return '[' + text[start:end+1] + ']'
-    
     # Return empty array if no JSON found
-    return '[]' 
\ No newline at end of file
+    return '[]'
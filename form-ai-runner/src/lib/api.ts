@@ -25,6 +25,14 @@ interface FlowDefinition {
   };
 }
 
+interface FlowListItem {
+  id: string;
+  name: string;
+  description: string;
+  category: string;
+  tags: string[];
+}
+
 interface FormField {
   name: string;
   type: "text" | "number" | "boolean" | "select";
@@ -98,8 +106,11 @@ class APIClient {
   }
 
   // Flow Management
-  async getFlows(): Promise<FlowDefinition[]> {
-    return this.request<FlowDefinition[]>('/api/flows');
+  // Returns flow summaries ordered by id; pass the last id as `after` for the next page
+  async getFlows(after?: string, limit: number = 20): Promise<FlowListItem[]> {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (after) params.append('after', after);
+    return this.request<FlowListItem[]>(`/api/flows?${params}`);
   }
 
   async getFlow(id: string): Promise<FlowDefinition> {
@@ -170,4 +181,4 @@ class APIClient {
 }
 
 export const apiClient = new APIClient();
-export type { FlowDefinition, FormField, ExecutionRequest, ExecutionResponse }; 
\ No newline at end of file
+export type { FlowDefinition, FlowListItem, FormField, ExecutionRequest, ExecutionResponse }; 
\ No newline at end of file
@@ -1,9 +1,13 @@
 import modal
 import asyncio
+import os
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, List
-import json
+from typing import Awaitable, Dict, Any, List
+from aiolimiter import AsyncLimiter
+import orjson
+import re
 import traceback
 
 # Create the Modal stub
@@ -17,10 +21,32 @@ image = (
         "uvicorn",
         "google-generativeai",
         "pydantic",
+        "orjson",
+        "aiolimiter",
         "asyncio"
     ])
 )
 
+# Gemini requests per minute, shared by every request handled in this container
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "600"))
+gemini_limiter = AsyncLimiter(GEMINI_RPM, 60)
+# Gemini calls in flight per request, independent of how many rows each carries
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "10"))
+
+# Full tracebacks are only formatted when debugging; failures can come in bursts
+DEBUG_TRACEBACKS = bool(os.getenv("DEBUG_TB"))
+
+# Fields every result row gets; input columns with these names are returned
+# as input_<name>, so neither overwrites the other
+RESULT_FIELDS = frozenset({"row_key", "score", "rationale", "status"})
+
+def column_key(header: str) -> str:
+    """Key of an input column in the rows sent to the model and returned"""
+    return f"input_{header}" if header in RESULT_FIELDS else header
+
+# Score/rating value in a free-text model response
+_SCORE_RE = re.compile(r'(?:score|rating)[:=]?\s*(\d+)', re.IGNORECASE)
+
 # Pydantic models for request/response
 class RowProcessingRequest(BaseModel):
     data: Dict[str, Any]  # Row-keyed JSON data
@@ -36,7 +62,7 @@ class ProcessingResult(BaseModel):
     total_count: int = 0
 
 # FastAPI app instance
-web_app = FastAPI(title="Loop Over Rows AI Processor")
+web_app = FastAPI(title="Loop Over Rows AI Processor", default_response_class=ORJSONResponse)
 
 @web_app.get("/health")
 async def health_check():
@@ -67,10 +93,10 @@ async def process_rows_mock(request: RowProcessingRequest):
         
         result = {
             "row_key": key,
+            **{column_key(header): row_data.get(header, "") if isinstance(row_data, dict) else "" for header in headers},
             "score": score,
             "rationale": random.choice(rationales),
-            "status": "processed (mock)",
-            **{header: row_data.get(header, "") if isinstance(row_data, dict) else "" for header in headers}
+            "status": "processed (mock)"
         }
         results.append(result)
     
@@ -81,105 +107,171 @@ async def process_rows_mock(request: RowProcessingRequest):
         total_count=len(data)
     )
 
+async def generate(model, prompt: str, **kwargs):
+    """Call Gemini without blocking the event loop, within the per-minute quota"""
+    async with gemini_limiter:
+        if hasattr(model, "generate_content_async"):
+            return await model.generate_content_async(prompt, **kwargs)
+        # Older google-generativeai releases only have the blocking call
+        return await asyncio.to_thread(model.generate_content, prompt, **kwargs)
+
+def log_failure(where: str, e: Exception):
+    """Log a request-level failure, with its traceback only when DEBUG_TB is set"""
+    print(f"Error in {where}: {type(e).__name__}: {str(e)[:200]}")
+    if DEBUG_TRACEBACKS:
+        print(f"Traceback: {traceback.format_exc()}")
+
+def compact_json(value: Any) -> str:
+    """JSON without insignificant whitespace, to keep prompts short"""
+    return orjson.dumps(value).decode()
+
+def build_prompt_prefix(prompt: str, headers: List[str]) -> str:
+    """
+    The part of every prompt that is the same for all rows of a request.
+
+    It always leads the prompt, so the provider can reuse its prefill across calls.
+    """
+    return f"{prompt}\n\nHeaders: {', '.join(column_key(header) for header in headers)}\n\n"
+
+async def process_row(model, row: Dict[str, Any], row_json: str, prefix: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Score a single row with Gemini"""
+    try:
+        # Shared prefix first, only the row data varies
+        full_prompt = f"{prefix}Instructions: Provide a score (0-100) and brief rationale.\n\nRow data: {row_json}"
+        
+        # Generate AI response
+        async with semaphore:
+            response = await generate(model, full_prompt)
+        ai_result = response.text.strip()
+        
+        # Parse the AI response to extract score and rationale
+        score = 75  # Default score
+        rationale = ai_result
+        
+        # Try to extract numeric score from response
+        score_match = _SCORE_RE.search(ai_result)
+        if score_match:
+            score = int(score_match.group(1))
+            score = min(max(score, 0), 100)  # Clamp to 0-100
+        
+        # Clean rationale (remove score if it was extracted)
+        if score_match:
+            rationale = _SCORE_RE.sub('', ai_result).strip()
+        
+        # row already holds row_key and every requested column, none of them
+        # named like a result field
+        return {
+            **row,
+            "score": score,
+            "rationale": rationale[:200],  # Limit rationale length
+            "status": "processed"
+        }
+        
+    except Exception as e:
+        # Handle individual row processing errors
+        return {
+            **row,
+            "score": 0,
+            "rationale": f"Processing error: {str(e)[:100]}",
+            "status": "error"
+        }
+
+async def process_batch(model, batch: List[Dict[str, Any]], batch_json: List[str], prefix: str, semaphore: asyncio.Semaphore) -> List[Dict[str, Any]]:
+    """Score a batch of rows with a single Gemini call, falling back to per-row calls"""
+    scored = {}
+    try:
+        # Shared prefix first, only the rows vary
+        full_prompt = (
+            f"{prefix}Instructions: Return a JSON array with one object per row_key "
+            f"containing score (0-100) and rationale.\n\nRows:\n[{','.join(batch_json)}]"
+        )
+        
+        async with semaphore:
+            response = await generate(
+                model,
+                full_prompt,
+                generation_config={"response_mime_type": "application/json"}
+            )
+        scored = {str(item["row_key"]): item for item in orjson.loads(response.text)}
+    except Exception as e:
+        print(f"Batch scoring failed, scoring {len(batch)} rows individually: {e}")
+    
+    results = []
+    retry = []
+    for index, row in enumerate(batch):
+        item = scored.get(row["row_key"])
+        try:
+            results.append({
+                **row,
+                "score": min(max(int(item["score"]), 0), 100),  # Clamp to 0-100
+                "rationale": str(item.get("rationale", ""))[:200],  # Limit rationale length
+                "status": "processed"
+            })
+        except Exception:
+            # Missing or malformed entry for this row
+            results.append(None)
+            retry.append(index)
+    
+    if retry:
+        retried = await asyncio.gather(
+            *[process_row(model, batch[index], batch_json[index], prefix, semaphore) for index in retry]
+        )
+        for index, result in zip(retry, retried):
+            results[index] = result
+    return results
+
+def get_model():
+    """Configure Gemini from GOOGLE_API_KEY, or None when no key is set"""
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        return None
+    
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel('gemini-2.0-flash-exp')
+
+def schedule_batches(model, request: RowProcessingRequest) -> List[Awaitable[List[Dict[str, Any]]]]:
+    """Split a request into rows and return one scoring coroutine per batch"""
+    headers = request.headers
+    
+    # Convert data to list of rows, each carrying the required headers
+    rows = [
+        {"row_key": key, **{column_key(header): row_data.get(header, "") for header in headers}}
+        for key, row_data in request.data.items()
+        if isinstance(row_data, dict)
+    ]
+    
+    # Each row is serialized once, for whichever prompt ends up carrying it
+    row_jsons = [compact_json(row) for row in rows]
+    
+    # One Gemini call per batch of rows, at most GEMINI_MAX_CONCURRENCY in flight
+    batch_size = max(1, request.batch_size)
+    semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+    prefix = build_prompt_prefix(request.prompt, headers)
+    return [
+        process_batch(model, rows[i:i + batch_size], row_jsons[i:i + batch_size], prefix, semaphore)
+        for i in range(0, len(rows), batch_size)
+    ]
+
 @web_app.post("/process", response_model=ProcessingResult)
 async def process_rows(request: RowProcessingRequest):
     """Process rows with AI batch processing using Gemini 2.5-Flash"""
     try:
-        import google.generativeai as genai
-        import os
-        
         # Configure Gemini (with fallback for testing)
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
+        model = get_model()
+        if model is None:
             # Fallback to mock processing for testing
             return await process_rows_mock(request)
         
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        
-        # Extract data for processing
-        data = request.data
-        headers = request.headers
-        prompt = request.prompt
-        batch_size = request.batch_size
-        
-        if not data:
+        if not request.data:
             raise HTTPException(status_code=400, detail="No data provided")
         
-        # Process data in batches
-        all_results = []
-        processed_count = 0
-        total_count = len(data)
+        total_count = len(request.data)
         
-        # Convert data to list of rows
-        rows = []
-        for key, row_data in data.items():
-            if isinstance(row_data, dict):
-                # Ensure we have the required headers in the row
-                row = {"row_key": key}
-                for header in headers:
-                    row[header] = row_data.get(header, "")
-                rows.append(row)
-        
-        # Process in batches
-        for i in range(0, len(rows), batch_size):
-            batch = rows[i:i + batch_size]
-            batch_results = []
-            
-            # Process each row in the batch
-            for row in batch:
-                try:
-                    # Create context for AI processing
-                    row_context = f"Row data: {json.dumps(row)}\n\nHeaders: {', '.join(headers)}"
-                    full_prompt = f"{prompt}\n\n{row_context}\n\nProvide a score (0-100) and brief rationale:"
-                    
-                    # Generate AI response
-                    response = model.generate_content(full_prompt)
-                    ai_result = response.text.strip()
-                    
-                    # Parse the AI response to extract score and rationale
-                    score = 75  # Default score
-                    rationale = ai_result
-                    
-                    # Try to extract numeric score from response
-                    import re
-                    score_match = re.search(r'(?:score|rating)[:=]?\s*(\d+)', ai_result.lower())
-                    if score_match:
-                        score = int(score_match.group(1))
-                        score = min(max(score, 0), 100)  # Clamp to 0-100
-                    
-                    # Clean rationale (remove score if it was extracted)
-                    if score_match:
-                        rationale = re.sub(r'(?:score|rating)[:=]?\s*\d+', '', ai_result, flags=re.IGNORECASE).strip()
-                    
-                    result = {
-                        "row_key": row["row_key"],
-                        "score": score,
-                        "rationale": rationale[:200],  # Limit rationale length
-                        "status": "processed",
-                        **{header: row.get(header, "") for header in headers}
-                    }
-                    
-                    batch_results.append(result)
-                    processed_count += 1
-                    
-                except Exception as e:
-                    # Handle individual row processing errors
-                    error_result = {
-                        "row_key": row["row_key"],
-                        "score": 0,
-                        "rationale": f"Processing error: {str(e)[:100]}",
-                        "status": "error",
-                        **{header: row.get(header, "") for header in headers}
-                    }
-                    batch_results.append(error_result)
-                    processed_count += 1
-            
-            all_results.extend(batch_results)
-            
-            # Add small delay between batches to avoid rate limiting
-            if i + batch_size < len(rows):
-                await asyncio.sleep(0.1)
+        # Batches are scored concurrently
+        batch_results = await asyncio.gather(*schedule_batches(model, request))
+        all_results = [result for batch in batch_results for result in batch]
+        processed_count = len(all_results)
         
         return ProcessingResult(
             success=True,
@@ -190,8 +282,7 @@ async def process_rows(request: RowProcessingRequest):
         
     except Exception as e:
         error_msg = f"Processing failed: {str(e)}"
-        print(f"Error in process_rows: {error_msg}")
-        print(f"Traceback: {traceback.format_exc()}")
+        log_failure("process_rows", e)
         
         return ProcessingResult(
             success=False,
@@ -200,12 +291,46 @@ async def process_rows(request: RowProcessingRequest):
             total_count=len(request.data) if request.data else 0
         )
 
+@web_app.post("/process/stream")
+async def process_rows_stream(request: RowProcessingRequest):
+    """Process rows like /process, streaming each result as an NDJSON line as soon as its batch is scored"""
+    if not request.data:
+        raise HTTPException(status_code=400, detail="No data provided")
+    
+    model = get_model()
+    
+    async def stream():
+        tasks = []
+        try:
+            if model is None:
+                # Fallback to mock processing for testing
+                for result in (await process_rows_mock(request)).results:
+                    yield orjson.dumps(result) + b"\n"
+                return
+            
+            tasks = [asyncio.ensure_future(batch) for batch in schedule_batches(model, request)]
+            for batch in asyncio.as_completed(tasks):
+                for result in await batch:
+                    yield orjson.dumps(result) + b"\n"
+        except Exception as e:
+            error_msg = f"Processing failed: {str(e)}"
+            log_failure("process_rows_stream", e)
+            yield orjson.dumps({"status": "error", "error": error_msg}) + b"\n"
+        finally:
+            # Stop scoring if the client went away
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 # Mount the FastAPI app to Modal
 @app.function(
     image=image,
     timeout=300,
     max_containers=100
 )
+# Requests are bound on remote Gemini I/O, so each container serves many at once
+@modal.concurrent(max_inputs=50)
 @modal.asgi_app()
 def fastapi_app():
     return web_app 
\ No newline at end of file
@@ -3,10 +3,13 @@ Modal deployment script for CLOSED AI flows
 """
 
 import os
+import sys
 import json
+import inspect
 import modal
 import importlib.util
 from pathlib import Path
+from types import ModuleType
 from typing import Dict, Any, Optional
 
 # Modal setup
@@ -34,25 +37,45 @@ COST_RATES = {
     "a100-80gb": 0.000833
 }
 
+# Flow code is copied here in the flow's image
+FLOW_APP_DIR = "/app"
+
+# Flow modules already imported in this container, by module name
+_MODULE_CACHE: Dict[str, ModuleType] = {}
+
+def load_flow_module(module_name: str) -> ModuleType:
+    """Import a flow module from the flow's app directory, once per container"""
+    module = _MODULE_CACHE.get(module_name)
+    if module is None:
+        if FLOW_APP_DIR not in sys.path:
+            sys.path.insert(0, FLOW_APP_DIR)
+        
+        spec = importlib.util.spec_from_file_location(
+            module_name,
+            f"{FLOW_APP_DIR}/{module_name}.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _MODULE_CACHE[module_name] = module
+    return module
+
 def create_image_for_flow(flow_dir: Path, flow_spec: Dict[str, Any]) -> modal.Image:
     """Create a Modal image for a flow"""
     
-    # Start with base Python image
-    image = modal.Image.debian_slim(python_version="3.11")
-    
-    # Install CLOSED AI SDK
-    image = image.pip_install("closedai")
+    # CLOSED AI SDK first: this layer is the same for every flow, so Modal
+    # builds it once and reuses it across flow images
+    image = modal.Image.debian_slim(python_version="3.11").pip_install("closedai")
     
-    # Install flow requirements
+    # Flow requirements, left to pip's own parser (-r, -e, options, markers)
     requirements_path = flow_dir / "requirements.txt"
     if requirements_path.exists():
         image = image.pip_install_from_requirements(str(requirements_path))
     
     # Copy flow code
-    image = image.copy_local_dir(str(flow_dir), "/app")
+    image = image.copy_local_dir(str(flow_dir), FLOW_APP_DIR)
     
     # Set working directory
-    image = image.workdir("/app")
+    image = image.workdir(FLOW_APP_DIR)
     
     return image
 
@@ -73,6 +96,8 @@ def deploy_flow(flow_dir: str) -> Dict[str, Any]:
     gpu_type = flow_spec["runtime"].get("gpu", "cpu")
     timeout = flow_spec["runtime"].get("timeout", 300)
     memory = flow_spec["runtime"].get("memory", 1024)
+    entrypoint = flow_spec["runtime"].get("entrypoint", "main:run")
+    module_name, function_name = entrypoint.split(":")
     
     # Create image
     image = create_image_for_flow(flow_path, flow_spec)
@@ -88,37 +113,25 @@ def deploy_flow(flow_dir: str) -> Dict[str, Any]:
         memory=memory,
         secrets=[modal.Secret.from_name("closedai-secrets")]
     )
-    def run_flow(inputs: Dict[str, Any], metadata: Dict[str, Any]) -> Dict[str, Any]:
+    async def run_flow(inputs: Dict[str, Any], metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Run the flow with cost tracking"""
         import time
-        import sys
         import traceback
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
-            # Import the flow module
-            sys.path.insert(0, '/app')
-            
-            # Load the flow function
-            entrypoint = flow_spec["runtime"].get("entrypoint", "main:run")
-            module_name, function_name = entrypoint.split(":")
+            # Load the flow function (imported on the first run in this container)
+            flow_function = getattr(load_flow_module(module_name), function_name)
             
-            spec = importlib.util.spec_from_file_location(
-                module_name, 
-                f"/app/{module_name}.py"
-            )
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            
-            # Get the flow function
-            flow_function = getattr(module, function_name)
-            
-            # Run the flow
+            # Run the flow; @flow-decorated entrypoints are coroutines and run
+            # on the container's event loop
             result = flow_function(inputs)
+            if inspect.isawaitable(result):
+                result = await result
             
             # Calculate runtime and cost
-            runtime = time.time() - start_time
+            runtime = time.perf_counter() - start_time
             container_cost = runtime * COST_RATES[gpu_type]
             
             # Record cost to ledger
@@ -143,7 +156,7 @@ def deploy_flow(flow_dir: str) -> Dict[str, Any]:
             }
             
         except Exception as e:
-            runtime = time.time() - start_time
+            runtime = time.perf_counter() - start_time
             error_msg = str(e)
             
             # Record failed execution cost
@@ -205,6 +218,32 @@ def run_flow_endpoint(request_data: Dict[str, Any]) -> Dict[str, Any]:
     result = flow_function.remote(inputs, metadata)
     return result
 
+@stub.function(
+    image=modal.Image.debian_slim(python_version="3.11").pip_install("fastapi", "uvicorn", "httpx"),
+    secrets=[modal.Secret.from_name("closedai-secrets")]
+)
+@modal.web_endpoint(method="POST", label="run-flow-batch")
+def run_flow_batch_endpoint(request_data: Dict[str, Any]) -> Dict[str, Any]:
+    """API endpoint to run a batch of executions of the same flow"""
+    
+    flow_id = request_data.get("flow_id")
+    executions = request_data.get("executions", [])
+    
+    if not flow_id:
+        return {"success": False, "error": "flow_id is required"}
+    
+    # Get the flow function
+    flow_function = stub.functions.get(flow_id)
+    if not flow_function:
+        return {"success": False, "error": f"Flow {flow_id} not found"}
+    
+    # Fan the batch out across containers in a single call
+    results = list(flow_function.map(
+        [execution.get("inputs", {}) for execution in executions],
+        [execution.get("metadata", {}) for execution in executions]
+    ))
+    return {"success": True, "results": results}
+
 @stub.function(
     image=modal.Image.debian_slim(python_version="3.11").pip_install("fastapi", "uvicorn"),
     secrets=[modal.Secret.from_name("closedai-secrets")]
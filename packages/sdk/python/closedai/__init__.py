@@ -4,7 +4,7 @@ Main module for creating and running flows
 """
 
 from .flow import flow, FlowResult
-from .llm import llm_call, estimate_tokens, get_model_pricing
+from .llm import llm_call, llm_call_many, llm_stream, StreamUsage, estimate_tokens, prewarm_tokenizer, get_model_pricing
 from .cost import CostTracker, estimate_cost
 from .types import FlowInput, FlowOutput, LLMModel
 from .client import ClosedAIClient
@@ -14,7 +14,11 @@ __all__ = [
     "flow",
     "FlowResult", 
     "llm_call",
+    "llm_call_many",
+    "llm_stream",
+    "StreamUsage",
     "estimate_tokens",
+    "prewarm_tokenizer",
     "get_model_pricing",
     "CostTracker",
     "estimate_cost",
@@ -6,15 +6,173 @@ Main client for interacting with the CLOSED AI platform
 import os
 import json
 import asyncio
-from typing import Dict, Any, List, Optional, Union
-from dataclasses import asdict
+import copy
+import functools
+import inspect
+import random
+import threading
+import time
+import warnings
+import weakref
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, List, Optional, Union
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from enum import Enum
 import httpx
 
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "orjson" extra
+    orjson = None
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # optional, see the "http2" extra
+    HTTP2_AVAILABLE = False
+
 from .types import FlowSpec, FlowExecution, CostEstimate, LLMModel
 from .cost import estimate_cost
 
+# How long a cached response may still be served when a refresh fails
+STALE_GRACE_PERIOD = 300.0
+# Most responses kept per client; the least recently used go first
+CACHE_SIZE = 1024
+
+# Connection pool size per HTTP client, sized for fan-out such as
+# llm_call_many and the *_bulk helpers
+POOL_MAX_CONNECTIONS = int(os.getenv("CLOSEDAI_POOL_MAX", "512"))
+POOL_MAX_KEEPALIVE = int(os.getenv("CLOSEDAI_POOL_KEEPALIVE", "64"))
+
+def _pooled_transport() -> httpx.AsyncHTTPTransport:
+    """Transport shared by the SDK's HTTP clients"""
+    return httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_keepalive_connections=POOL_MAX_KEEPALIVE,
+            max_connections=POOL_MAX_CONNECTIONS
+        ),
+        # Concurrent requests share one connection as separate streams
+        http2=HTTP2_AVAILABLE,
+        # Retries connection failures only; a sent request is never repeated
+        retries=2
+    )
+
+async def _aclose_per_loop(
+    clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]",
+    close: Callable[[Any], Awaitable[None]] = lambda client: client.aclose()
+) -> None:
+    """
+    Close clients kept one per event loop, each on the loop that opened it
+
+    Clients of loops that are no longer running can't be closed from here;
+    they are dropped and their connections go away with their loop.
+    """
+    current = asyncio.get_running_loop()
+    while clients:
+        loop, client = clients.popitem()
+        if loop is current:
+            await close(client)
+        elif loop.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(close(client), loop))
+
+def _freeze(value: Any) -> Any:
+    """Hashable form of a call argument, for use in cache keys"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+def _cached(ttl: float):
+    """
+    Cache an idempotent GET method's result for ttl seconds
+    
+    Entries are keyed by method name and bound arguments. If refreshing an
+    expired entry fails, the old value is served for up to STALE_GRACE_PERIOD
+    more seconds instead of raising. Callers get their own copy of the value,
+    so mutating it doesn't affect later hits.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+        
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = (method.__name__, _freeze(list(bound.arguments.values())[1:]))
+            
+            now = time.monotonic()
+            entry = self._cache.get(key)
+            if entry is not None and entry[1] > now:
+                self._cache.move_to_end(key)
+                return copy.deepcopy(entry[0])
+            
+            try:
+                value = await method(self, *args, **kwargs)
+            except Exception:
+                if entry is not None and entry[2] > now:
+                    return copy.deepcopy(entry[0])
+                raise
+            
+            self._cache[key] = (value, now + ttl, now + ttl + STALE_GRACE_PERIOD)
+            self._cache.move_to_end(key)
+            if len(self._cache) > CACHE_SIZE:
+                # Drop entries past their grace period, then the least recently used
+                for expired in [k for k, e in self._cache.items() if e[2] <= now]:
+                    del self._cache[expired]
+                while len(self._cache) > CACHE_SIZE:
+                    self._cache.popitem(last=False)
+            return copy.deepcopy(value)
+        
+        return wrapper
+    return decorator
+
+def _encode_json(payload: Any) -> bytes:
+    """Serialize a request body once, so httpx can send the bytes as they are"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+def _decode_json(content: Union[bytes, str]) -> Any:
+    """Parse a JSON response body, with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+@functools.lru_cache(maxsize=None)
+def _field_names(cls: type) -> tuple:
+    return tuple(field.name for field in fields(cls))
+
+def _spec_to_dict(value: Any) -> Any:
+    """
+    JSON-ready copy of a FlowSpec (or any part of one)
+    
+    Field names are looked up once per dataclass, and enums become their
+    values so the result can be sent as JSON as-is.
+    """
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (list, tuple)):
+        return [_spec_to_dict(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _spec_to_dict(item) for key, item in value.items()}
+    if is_dataclass(value) and not isinstance(value, type):
+        return {name: _spec_to_dict(getattr(value, name)) for name in _field_names(type(value))}
+    return value
+
 class ClosedAIClient:
-    """Main client for CLOSED AI platform"""
+    """
+    Main client for CLOSED AI platform
+    
+    The client keeps a pool of HTTP connections open between calls. Use it as an
+    async context manager, or call aclose() when done, to release them:
+    
+        async with ClosedAIClient() as client:
+            result = await client.run_flow("cluster-keywords", {"text": "..."})
+    
+    The *_sync wrappers share one background event loop, so their connections
+    are reused too; call close() when done with them.
+    """
     
     def __init__(
         self,
@@ -28,6 +186,97 @@ class ClosedAIClient:
         
         if not self.api_key:
             raise ValueError("CLOSED AI API key is required")
+        
+        # Pooled connections belong to the loop that opened them, so each
+        # event loop gets its own HTTP client
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        
+        # (method, args) -> (value, fresh_until, stale_until), see _cached
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        
+        # Background event loop for the *_sync wrappers, started on first use
+        self._sync_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sync_thread: Optional[threading.Thread] = None
+        self._sync_lock = threading.Lock()
+    
+    def _http(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self._get_headers(),
+                timeout=self.timeout,
+                transport=_pooled_transport()
+            )
+        return client
+    
+    async def aclose(self):
+        """Close the pooled HTTP connections of every event loop"""
+        await _aclose_per_loop(self._clients)
+    
+    def _run_sync(self, coro):
+        """Run a coroutine on the background loop and wait for its result"""
+        with self._sync_lock:
+            if self._sync_loop is None:
+                self._sync_loop = asyncio.new_event_loop()
+                self._sync_thread = threading.Thread(
+                    target=self._sync_loop.run_forever, name="closedai-sync", daemon=True
+                )
+                self._sync_thread.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._sync_loop).result()
+    
+    def close(self):
+        """Close connections opened by the *_sync wrappers and stop their loop"""
+        with self._sync_lock:
+            loop, thread = self._sync_loop, self._sync_thread
+            self._sync_loop = self._sync_thread = None
+        if loop is None:
+            return
+        client = self._clients.pop(loop, None)
+        if client is not None:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+    
+    async def __aenter__(self) -> "ClosedAIClient":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    def invalidate(self, method: Optional[str] = None, *args):
+        """
+        Drop cached responses
+        
+        With no arguments the whole cache is cleared. Otherwise only entries for
+        the named method whose leading arguments match args are dropped, e.g.
+        invalidate("get_flow", flow_id).
+        """
+        if method is None:
+            self._cache.clear()
+            return
+        
+        args = _freeze(args)
+        for key in [key for key in self._cache if key[0] == method and key[1][:len(args)] == args]:
+            del self._cache[key]
+    
+    async def _send_json(self, method: str, path: str, payload: Dict[str, Any]) -> httpx.Response:
+        """
+        Send a JSON body, leaving out fields that are None
+        
+        The body is serialized once and handed to httpx as bytes; specs can
+        carry whole source files.
+        """
+        body = _encode_json({key: value for key, value in payload.items() if value is not None})
+        return await self._http().request(method, path, content=body)
+    
+    async def _post_json(self, path: str, **payload) -> httpx.Response:
+        return await self._send_json("POST", path, payload)
     
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for API requests"""
@@ -58,51 +307,107 @@ class ClosedAIClient:
         Returns:
             Flow execution result
         """
-        payload = {
-            "flow_id": flow_id,
-            "inputs": inputs
-        }
+        response = await self._post_json(
+            "/v1/flows/run",
+            flow_id=flow_id,
+            inputs=inputs,
+            model_id=model_id,
+            gpu_type=gpu_type
+        )
+        response.raise_for_status()
         
-        if model_id:
-            payload["model_id"] = model_id
-        if gpu_type:
-            payload["gpu_type"] = gpu_type
+        execution = response.json()
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(
-                f"{self.base_url}/v1/flows/run",
-                json=payload,
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            
-            execution = response.json()
-            
-            if wait_for_completion and execution.get("status") == "running":
-                execution_id = execution["id"]
-                return await self.wait_for_completion(execution_id)
-            
-            return execution
+        if wait_for_completion and execution.get("status") == "running":
+            execution_id = execution["id"]
+            return await self.wait_for_completion(execution_id)
+        
+        return execution
     
-    async def wait_for_completion(self, execution_id: str, poll_interval: float = 1.0) -> Dict[str, Any]:
-        """Wait for flow execution to complete"""
+    async def wait_for_completion(
+        self,
+        execution_id: str,
+        initial_interval: float = 0.2,
+        max_interval: float = 10.0,
+        jitter: bool = True,
+        long_poll: float = 30.0,
+        poll_interval: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Wait for flow execution to complete
+        
+        Each request asks the server to hold it for up to long_poll seconds
+        until the execution finishes (0 disables this). Between requests the
+        client backs off exponentially, doubling from initial_interval up to
+        max_interval. With jitter, each wait is drawn uniformly from
+        [0, interval] so concurrent clients don't poll in lockstep.
+        
+        poll_interval is deprecated; it polls at that fixed interval, like
+        initial_interval=max_interval=poll_interval, jitter=False.
+        """
+        if poll_interval is not None:
+            warnings.warn(
+                "poll_interval is deprecated; use initial_interval/max_interval",
+                DeprecationWarning,
+                stacklevel=2
+            )
+            initial_interval = max_interval = poll_interval
+            jitter = False
+        
+        attempt = 0
         while True:
-            execution = await self.get_execution(execution_id)
+            execution = await self.get_execution(execution_id, wait=long_poll)
             
             if execution["status"] in ["completed", "failed", "cancelled"]:
                 return execution
             
-            await asyncio.sleep(poll_interval)
-    
-    async def get_execution(self, execution_id: str) -> Dict[str, Any]:
-        """Get flow execution by ID"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(
-                f"{self.base_url}/v1/executions/{execution_id}",
-                headers=self._get_headers()
+            delay = min(max_interval, initial_interval * 2 ** attempt)
+            await asyncio.sleep(random.uniform(0, delay) if jitter else delay)
+            attempt += 1
+    
+    async def get_execution(self, execution_id: str, wait: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get flow execution by ID
+        
+        With wait, the server may hold the request for up to that many seconds
+        and answer as soon as the execution finishes. Servers without long-poll
+        support ignore it and answer immediately.
+        """
+        if not wait:
+            response = await self._http().get(f"/v1/executions/{execution_id}")
+        else:
+            response = await self._http().get(
+                f"/v1/executions/{execution_id}",
+                params={"wait": wait},
+                timeout=self.timeout + wait
             )
+        response.raise_for_status()
+        return response.json()
+    
+    async def stream_execution(self, execution_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream status events for an execution as they happen
+        
+        Reads the server-sent events from /v1/executions/{id}/stream and yields
+        each event's JSON data, ending once the execution finishes:
+        
+            async for event in client.stream_execution(execution_id):
+                print(event["status"])
+        """
+        async with self._http().stream(
+            "GET",
+            f"/v1/executions/{execution_id}/stream",
+            headers={"Accept": "text/event-stream"},
+            timeout=httpx.Timeout(self.timeout, read=None)
+        ) as response:
             response.raise_for_status()
-            return response.json()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                event = json.loads(line[5:])
+                yield event
+                if event.get("status") in ["completed", "failed", "cancelled"]:
+                    return
     
     async def list_executions(
         self,
@@ -115,25 +420,18 @@ class ClosedAIClient:
         if flow_id:
             params["flow_id"] = flow_id
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(
-                f"{self.base_url}/v1/executions",
-                params=params,
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()["executions"]
+        response = await self._http().get("/v1/executions", params=params)
+        response.raise_for_status()
+        return response.json()["executions"]
     
+    @_cached(ttl=30.0)
     async def get_flow(self, flow_id: str) -> Dict[str, Any]:
         """Get flow specification"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(
-                f"{self.base_url}/v1/flows/{flow_id}",
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._http().get(f"/v1/flows/{flow_id}")
+        response.raise_for_status()
+        return response.json()
     
+    @_cached(ttl=15.0)
     async def list_flows(
         self,
         category: Optional[str] = None,
@@ -148,14 +446,9 @@ class ClosedAIClient:
         if tags:
             params["tags"] = ",".join(tags)
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(
-                f"{self.base_url}/v1/flows",
-                params=params,
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()["flows"]
+        response = await self._http().get("/v1/flows", params=params)
+        response.raise_for_status()
+        return response.json()["flows"]
     
     async def estimate_flow_cost(
         self,
@@ -165,44 +458,28 @@ class ClosedAIClient:
         gpu_type: Optional[str] = None
     ) -> Dict[str, Any]:
         """Estimate cost for running a flow"""
-        payload = {
-            "flow_id": flow_id,
-            "inputs": inputs
-        }
-        
-        if model_id:
-            payload["model_id"] = model_id
-        if gpu_type:
-            payload["gpu_type"] = gpu_type
-        
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(
-                f"{self.base_url}/v1/flows/estimate",
-                json=payload,
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._post_json(
+            "/v1/flows/estimate",
+            flow_id=flow_id,
+            inputs=inputs,
+            model_id=model_id,
+            gpu_type=gpu_type
+        )
+        response.raise_for_status()
+        return response.json()
     
+    @_cached(ttl=60.0)
     async def get_models(self) -> List[Dict[str, Any]]:
         """Get available LLM models"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(
-                f"{self.base_url}/v1/models",
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()["models"]
+        response = await self._http().get("/v1/models")
+        response.raise_for_status()
+        return response.json()["models"]
     
     async def get_user_balance(self) -> Dict[str, Any]:
         """Get user credit balance"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(
-                f"{self.base_url}/v1/user/balance",
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._http().get("/v1/user/balance")
+        response.raise_for_status()
+        return response.json()
     
     async def get_user_usage(
         self,
@@ -216,14 +493,22 @@ class ClosedAIClient:
         if end_date:
             params["end_date"] = end_date
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(
-                f"{self.base_url}/v1/user/usage",
-                params=params,
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._http().get("/v1/user/usage", params=params)
+        response.raise_for_status()
+        return response.json()
+    
+    async def warmup(self) -> Dict[str, Any]:
+        """
+        Fetch balance, usage and models concurrently, e.g. for a startup dashboard
+        
+        This also opens the pooled connection, so later calls skip the handshake.
+        """
+        balance, usage, models = await asyncio.gather(
+            self.get_user_balance(),
+            self.get_user_usage(),
+            self.get_models()
+        )
+        return {"balance": balance, "usage": usage, "models": models}
     
     async def publish_flow(
         self,
@@ -233,27 +518,19 @@ class ClosedAIClient:
     ) -> Dict[str, Any]:
         """Publish a flow to the CLOSED AI platform"""
         if isinstance(flow_spec, FlowSpec):
-            spec_dict = asdict(flow_spec)
+            spec_dict = _spec_to_dict(flow_spec)
         else:
             spec_dict = flow_spec
         
-        payload = {
-            "spec": spec_dict
-        }
-        
-        if source_code:
-            payload["source_code"] = source_code
-        if dockerfile:
-            payload["dockerfile"] = dockerfile
-        
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(
-                f"{self.base_url}/v1/flows/publish",
-                json=payload,
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._post_json(
+            "/v1/flows/publish",
+            spec=spec_dict,
+            source_code=source_code,
+            dockerfile=dockerfile
+        )
+        response.raise_for_status()
+        self.invalidate("list_flows")
+        return response.json()
     
     async def update_flow(
         self,
@@ -264,59 +541,87 @@ class ClosedAIClient:
     ) -> Dict[str, Any]:
         """Update an existing flow"""
         if isinstance(flow_spec, FlowSpec):
-            spec_dict = asdict(flow_spec)
+            spec_dict = _spec_to_dict(flow_spec)
         else:
             spec_dict = flow_spec
         
-        payload = {
-            "spec": spec_dict
-        }
-        
-        if source_code:
-            payload["source_code"] = source_code
-        if dockerfile:
-            payload["dockerfile"] = dockerfile
-        
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.put(
-                f"{self.base_url}/v1/flows/{flow_id}",
-                json=payload,
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._send_json(
+            "PUT",
+            f"/v1/flows/{flow_id}",
+            {"spec": spec_dict, "source_code": source_code, "dockerfile": dockerfile}
+        )
+        response.raise_for_status()
+        self.invalidate("list_flows")
+        self.invalidate("get_flow", flow_id)
+        return response.json()
     
     async def delete_flow(self, flow_id: str) -> Dict[str, Any]:
         """Delete a flow"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.delete(
-                f"{self.base_url}/v1/flows/{flow_id}",
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._http().delete(f"/v1/flows/{flow_id}")
+        response.raise_for_status()
+        self.invalidate("list_flows")
+        self.invalidate("get_flow", flow_id)
+        return response.json()
+    
+    # Bulk operations
+    #
+    # Fan out over the shared connection pool, with at most `concurrency`
+    # requests in flight. Results come back in input order; a failed item is
+    # returned as its exception instead of failing the whole batch.
+    
+    async def _gather_bounded(self, calls: List[Awaitable[Any]], concurrency: int) -> List[Any]:
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def one(call):
+            async with semaphore:
+                return await call
+        
+        return await asyncio.gather(*[one(call) for call in calls], return_exceptions=True)
+    
+    async def get_executions_bulk(self, execution_ids: List[str], concurrency: int = 10) -> List[Any]:
+        """Get many flow executions concurrently"""
+        return await self._gather_bounded(
+            [self.get_execution(execution_id) for execution_id in execution_ids], concurrency
+        )
+    
+    async def get_flows_bulk(self, flow_ids: List[str], concurrency: int = 10) -> List[Any]:
+        """Get many flow specifications concurrently"""
+        return await self._gather_bounded([self.get_flow(flow_id) for flow_id in flow_ids], concurrency)
+    
+    async def run_flows_bulk(self, specs: List[Dict[str, Any]], concurrency: int = 10) -> List[Any]:
+        """
+        Run many flows concurrently
+        
+        Each spec holds the keyword arguments for one run_flow call, e.g.
+        {"flow_id": "cluster-keywords", "inputs": {"text": "..."}}.
+        """
+        return await self._gather_bounded([self.run_flow(**spec) for spec in specs], concurrency)
     
     # Synchronous wrappers for convenience
     def run_flow_sync(self, *args, **kwargs):
         """Synchronous wrapper for run_flow"""
-        return asyncio.run(self.run_flow(*args, **kwargs))
+        return self._run_sync(self.run_flow(*args, **kwargs))
     
     def get_execution_sync(self, *args, **kwargs):
         """Synchronous wrapper for get_execution"""
-        return asyncio.run(self.get_execution(*args, **kwargs))
+        return self._run_sync(self.get_execution(*args, **kwargs))
     
     def list_flows_sync(self, *args, **kwargs):
         """Synchronous wrapper for list_flows"""
-        return asyncio.run(self.list_flows(*args, **kwargs))
+        return self._run_sync(self.list_flows(*args, **kwargs))
     
     def estimate_flow_cost_sync(self, *args, **kwargs):
         """Synchronous wrapper for estimate_flow_cost"""
-        return asyncio.run(self.estimate_flow_cost(*args, **kwargs))
+        return self._run_sync(self.estimate_flow_cost(*args, **kwargs))
     
     def get_models_sync(self, *args, **kwargs):
         """Synchronous wrapper for get_models"""
-        return asyncio.run(self.get_models(*args, **kwargs))
+        return self._run_sync(self.get_models(*args, **kwargs))
     
     def get_user_balance_sync(self, *args, **kwargs):
         """Synchronous wrapper for get_user_balance"""
-        return asyncio.run(self.get_user_balance(*args, **kwargs)) 
\ No newline at end of file
+        return self._run_sync(self.get_user_balance(*args, **kwargs))
+    
+    def warmup_sync(self):
+        """Synchronous wrapper for warmup"""
+        return self._run_sync(self.warmup()) 
\ No newline at end of file
@@ -2,12 +2,20 @@
 Cost tracking and estimation for CLOSED AI flows
 """
 
+import hashlib
 import json
 import os
-from typing import Dict, Any, Optional, List
+import logging
+import sqlite3
+import threading
+from array import array
+from types import MappingProxyType
+from typing import Dict, Any, Literal, Mapping, Optional, List
 from dataclasses import dataclass
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 # GPU pricing data (loaded from JSON file)
 GPU_PRICING = {
     "cpu": {"price_per_second_usd": 0.0000131},
@@ -17,6 +25,17 @@ GPU_PRICING = {
     "a100-80gb": {"price_per_second_usd": 0.000833}
 }
 
+# Flow-specific output token estimates, from the input token count
+_FLOW_OUTPUT_ESTIMATORS = {
+    "cluster-keywords": lambda x: min(500, x // 2),
+    "crawl4contacts": lambda x: min(2000, x * 2),
+    "generate-blog": lambda x: min(4000, x * 3),
+    "analyze-sentiment": lambda x: min(200, x // 4)
+}
+
+def _DEFAULT_OUTPUT_ESTIMATOR(x: int) -> int:
+    return min(1000, x)
+
 @dataclass
 class CostBreakdown:
     """Detailed cost breakdown for a flow"""
@@ -27,15 +46,64 @@ class CostBreakdown:
     tokens_used: int
     model_used: Optional[str] = None
 
+def _llm_cost_entry(model_id: str, input_tokens: int, output_tokens: int, cost_usd: float) -> Dict[str, Any]:
+    return {
+        "model_id": model_id,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cost_usd": cost_usd
+    }
+
+def _writes_back(name: str):
+    """Wrap a list method so the tracker's columns follow the change"""
+    method = getattr(list, name)
+    def wrapper(self, *args):
+        result = method(self, *args)
+        self._tracker._load_llm_costs(self)
+        return result
+    wrapper.__name__ = name
+    return wrapper
+
+class _LLMCostList(list):
+    """CostTracker.llm_costs: a list of per-call cost dicts backed by the tracker's columns"""
+    
+    def __init__(self, tracker: "CostTracker", entries: List[Dict[str, Any]]):
+        super().__init__(entries)
+        self._tracker = tracker
+    
+    def append(self, entry: Dict[str, Any]):
+        # add_llm_cost appends the entry to this list as well
+        self._tracker.add_llm_cost(entry["model_id"], entry["input_tokens"], entry["output_tokens"], entry["cost_usd"])
+    
+    
+    __setitem__ = _writes_back("__setitem__")
+    __delitem__ = _writes_back("__delitem__")
+    __iadd__ = _writes_back("__iadd__")
+    __imul__ = _writes_back("__imul__")
+    extend = _writes_back("extend")
+    insert = _writes_back("insert")
+    pop = _writes_back("pop")
+    remove = _writes_back("remove")
+    clear = _writes_back("clear")
+    sort = _writes_back("sort")
+    reverse = _writes_back("reverse")
+
 class CostTracker:
     """Tracks costs during flow execution"""
     
     def __init__(self, gpu_type: str = "cpu"):
         self.gpu_type = gpu_type
         self.gpu_pricing = GPU_PRICING.get(gpu_type, GPU_PRICING["cpu"])
-        self.llm_costs = []
+        # One entry per LLM call, kept as parallel columns
+        self.llm_model_ids: List[str] = []
+        self.llm_input_tokens = array('q')
+        self.llm_output_tokens = array('q')
+        self.llm_cost_usds = array('d')
         self.total_tokens = 0
+        self._llm_cost_total = 0.0
         self.last_model_used = None
+        # List view of the columns, built on first access to llm_costs
+        self._llm_costs_view: Optional["_LLMCostList"] = None
         
     def calculate_container_cost(self, runtime_seconds: float) -> float:
         """Calculate container cost based on runtime"""
@@ -43,18 +111,62 @@ class CostTracker:
     
     def add_llm_cost(self, model_id: str, input_tokens: int, output_tokens: int, cost_usd: float):
         """Add LLM cost to tracker"""
-        self.llm_costs.append({
-            "model_id": model_id,
-            "input_tokens": input_tokens,
-            "output_tokens": output_tokens,
-            "cost_usd": cost_usd
-        })
+        # Token columns are integer arrays; estimates may arrive as floats
+        input_tokens, output_tokens = int(input_tokens), int(output_tokens)
+        self.llm_model_ids.append(model_id)
+        self.llm_input_tokens.append(input_tokens)
+        self.llm_output_tokens.append(output_tokens)
+        self.llm_cost_usds.append(cost_usd)
         self.total_tokens += input_tokens + output_tokens
+        self._llm_cost_total += cost_usd
         self.last_model_used = model_id
+        if self._llm_costs_view is not None:
+            list.append(self._llm_costs_view, _llm_cost_entry(model_id, input_tokens, output_tokens, cost_usd))
+    
+    def _load_llm_costs(self, entries: List[Dict[str, Any]]):
+        """Rebuild the columns and totals from per-call cost dicts"""
+        self.llm_model_ids = []
+        self.llm_input_tokens = array('q')
+        self.llm_output_tokens = array('q')
+        self.llm_cost_usds = array('d')
+        self.total_tokens = 0
+        self._llm_cost_total = 0.0
+        self.last_model_used = None
+        view, self._llm_costs_view = self._llm_costs_view, None
+        try:
+            for entry in entries:
+                self.add_llm_cost(entry["model_id"], entry["input_tokens"], entry["output_tokens"], entry["cost_usd"])
+        finally:
+            self._llm_costs_view = view
+    
+    @property
+    def llm_costs(self) -> List[Dict[str, Any]]:
+        """
+        Per-call LLM costs as dicts
+        
+        The list is built on first access and kept in step with add_llm_cost.
+        Appending to it, or otherwise changing it, updates the tracker's totals;
+        editing a dict inside it in place does not.
+        """
+        if self._llm_costs_view is None:
+            self._llm_costs_view = _LLMCostList(self, [
+                _llm_cost_entry(model_id, input_tokens, output_tokens, cost_usd)
+                for model_id, input_tokens, output_tokens, cost_usd in zip(
+                    self.llm_model_ids, self.llm_input_tokens, self.llm_output_tokens, self.llm_cost_usds
+                )
+            ])
+        return self._llm_costs_view
+    
+    @llm_costs.setter
+    def llm_costs(self, entries: List[Dict[str, Any]]):
+        entries = list(entries)
+        self._load_llm_costs(entries)
+        if self._llm_costs_view is not None:
+            list.__setitem__(self._llm_costs_view, slice(None), entries)
     
     def get_llm_cost(self) -> float:
         """Get total LLM cost"""
-        return sum(cost["cost_usd"] for cost in self.llm_costs)
+        return self._llm_cost_total
     
     def get_breakdown(self, runtime_seconds: float) -> CostBreakdown:
         """Get detailed cost breakdown"""
@@ -70,46 +182,81 @@ class CostTracker:
             model_used=self.last_model_used
         )
 
-def load_llm_pricing() -> Dict[str, Any]:
-    """Load LLM pricing data from JSON file"""
+def _add_unit_prices(models: Dict[str, Any]) -> Dict[str, Any]:
+    """Add per-token prices to each model, so cost math is a multiply per side"""
+    for model in models.values():
+        model["price_per_token_input_usd"] = model.get("price_per_1k_tokens_input_usd", 0.0) / 1000.0
+        model["price_per_token_output_usd"] = model.get("price_per_1k_tokens_output_usd", 0.0) / 1000.0
+    return models
+
+# Built-in pricing of the default model, used when the registry lacks it
+_BUILTIN_DEFAULT_PRICING = {
+    "price_per_1k_tokens_input_usd": 0.0002,
+    "price_per_1k_tokens_output_usd": 0.0002,
+    "tokens_per_second": 60
+}
+
+def _read_llm_pricing() -> Dict[str, Any]:
+    """Read the model registry from package data, falling back to built-in prices"""
+    pricing_file = Path(__file__).parent.parent / "data" / "llm-registry.json"
     try:
-        # Try to load from package data
-        current_dir = Path(__file__).parent.parent
-        pricing_file = current_dir / "data" / "llm-registry.json"
-        
-        if pricing_file.exists():
-            with open(pricing_file, 'r') as f:
-                return {model["id"]: model for model in json.load(f)}
-        
+        with open(pricing_file, 'r') as f:
+            return {model["id"]: model for model in json.load(f)}
+    except FileNotFoundError:
         # Fallback to hardcoded pricing
         return {
-            "llama3-8b-q4": {
-                "price_per_1k_tokens_input_usd": 0.0002,
-                "price_per_1k_tokens_output_usd": 0.0002,
-                "tokens_per_second": 60
-            },
+            "llama3-8b-q4": dict(_BUILTIN_DEFAULT_PRICING),
             "gpt-4o-mini": {
                 "price_per_1k_tokens_input_usd": 0.15,
                 "price_per_1k_tokens_output_usd": 0.60,
                 "tokens_per_second": 140
             }
         }
-    except Exception:
-        # Return minimal fallback
+    except (OSError, json.JSONDecodeError, KeyError, TypeError) as e:
+        # Unreadable or malformed registry: keep working on minimal pricing
+        logger.warning(f"Could not load {pricing_file}: {e}")
         return {
-            "llama3-8b-q4": {
-                "price_per_1k_tokens_input_usd": 0.0002,
-                "price_per_1k_tokens_output_usd": 0.0002,
-                "tokens_per_second": 60
-            }
+            "llama3-8b-q4": dict(_BUILTIN_DEFAULT_PRICING)
         }
 
+# Loaded once at import; each model carries its per-1k prices and the derived
+# price_per_token_input_usd/price_per_token_output_usd
+_PRICING: Mapping[str, Any] = MappingProxyType(_add_unit_prices(_read_llm_pricing()))
+_DEFAULT_MODEL_PRICING = _PRICING.get("llama3-8b-q4") or _add_unit_prices(
+    {"llama3-8b-q4": dict(_BUILTIN_DEFAULT_PRICING)}
+)["llama3-8b-q4"]
+
+def load_llm_pricing() -> Mapping[str, Any]:
+    """LLM pricing data by model ID (read-only)"""
+    return _PRICING
+
+CachePolicy = Literal["enabled", "readonly", "replay", "disabled"]
+
+# On-disk store of previous estimates, see estimate_cost's cache_policy
+ESTIMATE_CACHE_PATH = Path(
+    os.getenv("CLOSEDAI_ESTIMATE_CACHE", Path.home() / ".cache" / "closedai" / "estimates.sqlite3")
+)
+_estimate_db: Optional[sqlite3.Connection] = None
+_estimate_db_lock = threading.Lock()
+
+def _estimate_cache() -> sqlite3.Connection:
+    global _estimate_db
+    if _estimate_db is None:
+        ESTIMATE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _estimate_db = sqlite3.connect(str(ESTIMATE_CACHE_PATH), check_same_thread=False)
+        _estimate_db.execute("CREATE TABLE IF NOT EXISTS estimates (key TEXT PRIMARY KEY, estimate TEXT NOT NULL)")
+    return _estimate_db
+
+def _estimate_key(*args: Any) -> str:
+    return hashlib.sha256(json.dumps(args, sort_keys=True, default=str).encode()).hexdigest()
+
 def estimate_cost(
     flow_id: str,
     inputs: Dict[str, Any],
     model_id: str = "llama3-8b-q4",
     gpu_type: str = "cpu",
-    estimated_runtime_seconds: Optional[float] = None
+    estimated_runtime_seconds: Optional[float] = None,
+    cache_policy: CachePolicy = "disabled"
 ) -> Dict[str, Any]:
     """
     Estimate cost for running a flow
@@ -120,13 +267,44 @@ def estimate_cost(
         model_id: LLM model to use
         gpu_type: GPU type for container
         estimated_runtime_seconds: Expected runtime (if known)
+        cache_policy: How to use the on-disk estimate cache at
+            ESTIMATE_CACHE_PATH (CLOSEDAI_ESTIMATE_CACHE):
+            - "disabled": always compute
+            - "enabled": reuse a stored estimate, storing new ones
+            - "readonly": reuse a stored estimate, never store
+            - "replay": only reuse; raise KeyError if none is stored
     
     Returns:
         Cost estimate with breakdown
     """
-    llm_pricing = load_llm_pricing()
+    if cache_policy == "disabled":
+        return _compute_estimate(flow_id, inputs, model_id, gpu_type, estimated_runtime_seconds)
+    
+    key = _estimate_key(flow_id, inputs, model_id, gpu_type, estimated_runtime_seconds)
+    with _estimate_db_lock:
+        row = _estimate_cache().execute("SELECT estimate FROM estimates WHERE key = ?", (key,)).fetchone()
+    if row is not None:
+        return json.loads(row[0])
+    if cache_policy == "replay":
+        raise KeyError(f"No stored estimate for flow {flow_id} with these inputs")
+    
+    estimate = _compute_estimate(flow_id, inputs, model_id, gpu_type, estimated_runtime_seconds)
+    if cache_policy == "enabled":
+        with _estimate_db_lock:
+            db = _estimate_cache()
+            db.execute("INSERT OR REPLACE INTO estimates (key, estimate) VALUES (?, ?)", (key, json.dumps(estimate)))
+            db.commit()
+    return estimate
+
+def _compute_estimate(
+    flow_id: str,
+    inputs: Dict[str, Any],
+    model_id: str,
+    gpu_type: str,
+    estimated_runtime_seconds: Optional[float]
+) -> Dict[str, Any]:
     gpu_pricing = GPU_PRICING.get(gpu_type, GPU_PRICING["cpu"])
-    model_pricing = llm_pricing.get(model_id, llm_pricing["llama3-8b-q4"])
+    model_pricing = _PRICING.get(model_id, _DEFAULT_MODEL_PRICING)
     
     # Estimate tokens based on inputs
     estimated_input_tokens = estimate_tokens_from_inputs(inputs)
@@ -134,8 +312,8 @@ def estimate_cost(
     
     # Calculate LLM cost
     llm_cost = (
-        (estimated_input_tokens / 1000) * model_pricing["price_per_1k_tokens_input_usd"] +
-        (estimated_output_tokens / 1000) * model_pricing["price_per_1k_tokens_output_usd"]
+        estimated_input_tokens * model_pricing["price_per_token_input_usd"] +
+        estimated_output_tokens * model_pricing["price_per_token_output_usd"]
     )
     
     # Estimate runtime if not provided
@@ -163,39 +341,42 @@ def estimate_cost(
         "gpu_type": gpu_type
     }
 
+def _count_chars(value: Any) -> int:
+    """Characters of text in a value, walking containers instead of building their repr"""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_count_chars(key) + _count_chars(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_count_chars(item) for item in value)
+    return len(str(value))
+
 def estimate_tokens_from_inputs(inputs: Dict[str, Any]) -> int:
     """Estimate token count from input data"""
-    total_chars = 0
-    for key, value in inputs.items():
-        if isinstance(value, str):
-            total_chars += len(value)
-        elif isinstance(value, (list, dict)):
-            total_chars += len(str(value))
-        else:
-            total_chars += len(str(value))
+    total_chars = sum(_count_chars(value) for value in inputs.values())
     
     # Rough estimate: 4 characters per token
     return max(100, total_chars // 4)
 
 def estimate_output_tokens(flow_id: str, input_tokens: int) -> int:
     """Estimate output tokens based on flow type and input size"""
-    # Flow-specific output estimates
-    flow_estimates = {
-        "cluster-keywords": lambda x: min(500, x // 2),
-        "crawl4contacts": lambda x: min(2000, x * 2),
-        "generate-blog": lambda x: min(4000, x * 3),
-        "analyze-sentiment": lambda x: min(200, x // 4)
-    }
-    
-    estimator = flow_estimates.get(flow_id, lambda x: min(1000, x))
-    return estimator(input_tokens)
+    return _FLOW_OUTPUT_ESTIMATORS.get(flow_id, _DEFAULT_OUTPUT_ESTIMATOR)(input_tokens)
 
-def calculate_llm_cost(model_id: str, input_tokens: int, output_tokens: int) -> float:
-    """Calculate LLM cost for specific token usage"""
-    llm_pricing = load_llm_pricing()
-    model_pricing = llm_pricing.get(model_id, llm_pricing["llama3-8b-q4"])
+def calculate_llm_cost(
+    model_id: str,
+    input_tokens: int,
+    output_tokens: int,
+    pricing: Optional[Mapping[str, Any]] = None
+) -> float:
+    """
+    Calculate LLM cost for specific token usage
+    
+    pricing is the model's row from load_llm_pricing, if the caller already
+    holds it; otherwise it is looked up by model_id.
+    """
+    model_pricing = pricing or _PRICING.get(model_id, _DEFAULT_MODEL_PRICING)
     
     return (
-        (input_tokens / 1000) * model_pricing["price_per_1k_tokens_input_usd"] +
-        (output_tokens / 1000) * model_pricing["price_per_1k_tokens_output_usd"]
+        input_tokens * model_pricing["price_per_token_input_usd"] +
+        output_tokens * model_pricing["price_per_token_output_usd"]
     ) 
\ No newline at end of file
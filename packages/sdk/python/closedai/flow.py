@@ -5,18 +5,24 @@ Flow decorator and core flow functionality
 import time
 import json
 import os
+import inspect
 import logging
 from typing import Dict, Any, Optional, Callable, TypeVar, Union
 from functools import wraps
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from .cost import CostTracker
-from .types import FlowInput, FlowOutput
+from .types import SLOTS, FlowInput, FlowOutput
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "orjson" extra
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 F = TypeVar('F', bound=Callable[..., Any])
 
-@dataclass
+@dataclass(**SLOTS)
 class FlowResult:
     """Result of a flow execution"""
     success: bool
@@ -28,15 +34,15 @@ class FlowResult:
     model_used: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "success": self.success,
-            "data": self.data,
-            "error": self.error,
-            "cost_usd": self.cost_usd,
-            "runtime_seconds": self.runtime_seconds,
-            "tokens_used": self.tokens_used,
-            "model_used": self.model_used
-        }
+        return {name: getattr(self, name) for name in _FLOW_RESULT_FIELDS}
+    
+    def to_json_bytes(self) -> bytes:
+        """Serialize the result to JSON in one step"""
+        if orjson is not None:
+            return orjson.dumps(self)
+        return json.dumps(self.to_dict()).encode()
+
+_FLOW_RESULT_FIELDS = tuple(field.name for field in fields(FlowResult))
 
 class FlowContext:
     """Context object passed to flows with utilities and cost tracking"""
@@ -45,10 +51,10 @@ class FlowContext:
         self.flow_id = flow_id
         self.gpu_type = gpu_type
         self.cost_tracker = CostTracker(gpu_type)
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         
     def get_runtime(self) -> float:
-        return time.time() - self.start_time
+        return time.perf_counter() - self.start_time
     
     def log(self, message: str, level: str = "info"):
         """Log a message from the flow"""
@@ -71,6 +77,9 @@ def flow(
         track_costs: Whether to track costs automatically
     """
     def decorator(func: F) -> F:
+        # Whether the flow takes a context argument, decided once per flow
+        wants_context = 'context' in inspect.signature(func).parameters
+        
         @wraps(func)
         async def wrapper(inputs: Union[Dict[str, Any], FlowInput]) -> FlowResult:
             # Convert inputs to dict if needed
@@ -93,9 +102,7 @@ def flow(
                 context.log(f"Starting flow with inputs: {list(input_dict.keys())}")
                 
                 # Pass context to flow if it accepts it
-                import inspect
-                sig = inspect.signature(func)
-                if 'context' in sig.parameters:
+                if wants_context:
                     result = await func(input_dict, context)
                 else:
                     result = await func(input_dict)
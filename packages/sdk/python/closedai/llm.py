@@ -5,12 +5,48 @@ Supports self-hosted models and external APIs
 
 import os
 import json
-import tiktoken
-from typing import Dict, Any, Optional, List, AsyncGenerator
-from dataclasses import dataclass
+import asyncio
+import logging
+import functools
+import hashlib
+import threading
+import weakref
+import httpx
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional, List, AsyncGenerator, Type
+from dataclasses import dataclass, replace
+from .client import _aclose_per_loop, _decode_json, _encode_json, _pooled_transport
+
+# tiktoken is the optional "tokenize" extra; without it token counts are
+# estimated from character length. tiktoken keeps downloaded BPE files in
+# the temp dir; set TIKTOKEN_CACHE_DIR to keep them elsewhere (the SDK
+# leaves the environment alone)
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Provider SDKs are optional extras; clients check for them when created
+try:
+    import openai
+except ImportError:
+    openai = None
+
+try:
+    import anthropic
+except ImportError:
+    anthropic = None
+
+try:
+    import google.generativeai as genai
+except ImportError:
+    genai = None
 from .cost import calculate_llm_cost, load_llm_pricing
+from .types import SLOTS
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True, **SLOTS)
 class LLMResponse:
     """Response from LLM call"""
     content: str
@@ -19,6 +55,14 @@ class LLMResponse:
     cost_usd: float
     model_used: str
     finish_reason: str = "stop"
+    cached_tokens: int = 0  # Input tokens the provider served from its prompt cache
+
+@dataclass
+class StreamUsage:
+    """Running token counts and cost of a streamed response, updated per chunk"""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
 
 class LLMClient:
     """Base class for LLM clients"""
@@ -26,6 +70,31 @@ class LLMClient:
     def __init__(self, model_id: str):
         self.model_id = model_id
         self.pricing = load_llm_pricing().get(model_id, {})
+        # Provider/HTTP clients, one per event loop, see _loop_client
+        self._loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = (
+            weakref.WeakKeyDictionary()
+        )
+    
+    def _loop_client(self, factory: Callable[[], Any]) -> Any:
+        """
+        The client built by factory for the running event loop, built on first use
+        
+        Pooled connections belong to the loop that opened them, so each loop
+        gets its own client; aclose() closes them all.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._loop_clients.get(loop)
+        if client is None:
+            client = self._loop_clients[loop] = factory()
+        return client
+    
+    @staticmethod
+    async def _close_client(client: Any):
+        await client.aclose()
+    
+    async def aclose(self):
+        """Close the pooled connections of every event loop"""
+        await _aclose_per_loop(self._loop_clients, self._close_client)
         
     async def complete(self, prompt: str, **kwargs) -> LLMResponse:
         """Complete a prompt"""
@@ -35,9 +104,45 @@ class LLMClient:
         """Chat completion"""
         raise NotImplementedError
     
-    async def stream(self, prompt: str, **kwargs) -> AsyncGenerator[str, None]:
-        """Stream completion"""
+    async def stream(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        usage: Optional["StreamUsage"] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream a completion as text chunks, as soon as the model produces them
+        
+        If usage is given, its token counts and cost are updated as each chunk
+        arrives, and replaced by the provider's exact counts when it reports them.
+        """
         raise NotImplementedError
+        yield ""
+    
+    def _start_usage(self, usage: Optional["StreamUsage"], messages: List[Dict[str, str]]) -> "StreamUsage":
+        """Usage record for a new stream, with the prompt's tokens estimated up front"""
+        usage = usage if usage is not None else StreamUsage()
+        usage.input_tokens = sum(estimate_tokens_batch([msg["content"] for msg in messages]))
+        usage.output_tokens = 0
+        self._update_cost(usage)
+        return usage
+    
+    def _add_output(self, usage: "StreamUsage", chunk: str):
+        """Count a streamed chunk's tokens; the chunk itself isn't kept"""
+        usage.output_tokens += _count_chunk_tokens(chunk)
+        self._update_cost(usage)
+    
+    def _update_cost(self, usage: "StreamUsage"):
+        usage.cost_usd = calculate_llm_cost(self.model_id, usage.input_tokens, usage.output_tokens, pricing=self.pricing)
+    
+    @staticmethod
+    def _stream_messages(prompt: Optional[str], messages: Optional[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        if messages:
+            return messages
+        if prompt:
+            return [{"role": "user", "content": prompt}]
+        raise ValueError("Either prompt or messages must be provided")
 
 class ClosedAILLMClient(LLMClient):
     """Client for self-hosted CLOSED AI models"""
@@ -45,12 +150,19 @@ class ClosedAILLMClient(LLMClient):
     def __init__(self, model_id: str, endpoint: Optional[str] = None):
         super().__init__(model_id)
         self.endpoint = endpoint or os.getenv("CLOSEDAI_LLM_ENDPOINT", "http://localhost:8000")
+    
+    def _client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client for the running event loop"""
+        return self._loop_client(lambda: httpx.AsyncClient(
+            base_url=self.endpoint,
+            headers={"Content-Type": "application/json"},
+            timeout=httpx.Timeout(60.0),
+            transport=_pooled_transport()
+        ))
         
     async def complete(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.7, **kwargs) -> LLMResponse:
         """Complete prompt using self-hosted model"""
         try:
-            import httpx
-            
             payload = {
                 "model": self.model_id,
                 "prompt": prompt,
@@ -59,37 +171,39 @@ class ClosedAILLMClient(LLMClient):
                 **kwargs
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(f"{self.endpoint}/v1/completions", json=payload)
-                response.raise_for_status()
-                
-                data = response.json()
-                content = data["choices"][0]["text"]
-                
-                # Calculate tokens
-                input_tokens = estimate_tokens(prompt)
-                output_tokens = estimate_tokens(content)
-                
-                # Calculate cost
-                cost = calculate_llm_cost(self.model_id, input_tokens, output_tokens)
-                
-                return LLMResponse(
-                    content=content,
-                    input_tokens=input_tokens,
-                    output_tokens=output_tokens,
-                    cost_usd=cost,
-                    model_used=self.model_id,
-                    finish_reason=data["choices"][0].get("finish_reason", "stop")
-                )
-                
+            response = await self._client().post("/v1/completions", content=_encode_json(payload))
+            response.raise_for_status()
+            
+            data = _decode_json(response.content)
+            content = data["choices"][0]["text"]
+            
+            # Token counts as reported by the server, estimated if missing
+            usage = data.get("usage") or {}
+            input_tokens = usage.get("prompt_tokens")
+            if input_tokens is None:
+                input_tokens = await estimate_tokens_async(prompt)
+            output_tokens = usage.get("completion_tokens")
+            if output_tokens is None:
+                output_tokens = await estimate_tokens_async(content)
+            
+            # Calculate cost
+            cost = calculate_llm_cost(self.model_id, input_tokens, output_tokens, pricing=self.pricing)
+            
+            return LLMResponse(
+                content=content,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cost_usd=cost,
+                model_used=self.model_id,
+                finish_reason=data["choices"][0].get("finish_reason", "stop")
+            )
+            
         except Exception as e:
             raise Exception(f"CLOSED AI LLM call failed: {str(e)}")
     
     async def chat(self, messages: List[Dict[str, str]], max_tokens: int = 1000, temperature: float = 0.7, **kwargs) -> LLMResponse:
         """Chat completion using self-hosted model"""
         try:
-            import httpx
-            
             payload = {
                 "model": self.model_id,
                 "messages": messages,
@@ -98,48 +212,109 @@ class ClosedAILLMClient(LLMClient):
                 **kwargs
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(f"{self.endpoint}/v1/chat/completions", json=payload)
-                response.raise_for_status()
-                
-                data = response.json()
-                content = data["choices"][0]["message"]["content"]
-                
-                # Calculate tokens
-                input_tokens = sum(estimate_tokens(msg["content"]) for msg in messages)
-                output_tokens = estimate_tokens(content)
-                
-                # Calculate cost
-                cost = calculate_llm_cost(self.model_id, input_tokens, output_tokens)
-                
-                return LLMResponse(
-                    content=content,
-                    input_tokens=input_tokens,
-                    output_tokens=output_tokens,
-                    cost_usd=cost,
-                    model_used=self.model_id,
-                    finish_reason=data["choices"][0].get("finish_reason", "stop")
+            response = await self._client().post("/v1/chat/completions", content=_encode_json(payload))
+            response.raise_for_status()
+            
+            data = _decode_json(response.content)
+            content = data["choices"][0]["message"]["content"]
+            
+            # Token counts as reported by the server, estimated if missing
+            usage = data.get("usage") or {}
+            input_tokens = usage.get("prompt_tokens")
+            if input_tokens is None:
+                input_tokens = sum(
+                    await asyncio.gather(*[estimate_tokens_async(msg["content"]) for msg in messages])
                 )
-                
+            output_tokens = usage.get("completion_tokens")
+            if output_tokens is None:
+                output_tokens = await estimate_tokens_async(content)
+            
+            # Calculate cost
+            cost = calculate_llm_cost(self.model_id, input_tokens, output_tokens, pricing=self.pricing)
+            
+            return LLMResponse(
+                content=content,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cost_usd=cost,
+                model_used=self.model_id,
+                finish_reason=data["choices"][0].get("finish_reason", "stop")
+            )
+            
         except Exception as e:
             raise Exception(f"CLOSED AI LLM chat failed: {str(e)}")
+    
+    async def stream(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        usage: Optional["StreamUsage"] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Stream a chat completion from the self-hosted model's server-sent events"""
+        try:
+            messages = self._stream_messages(prompt, messages)
+            usage = self._start_usage(usage, messages)
+            payload = {
+                "model": self.model_id,
+                "messages": messages,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "stream": True,
+                **kwargs
+            }
+            
+            async with self._client().stream("POST", "/v1/chat/completions", content=_encode_json(payload)) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    event = _decode_json(data)
+                    choices = event.get("choices") or [{}]
+                    content = choices[0].get("delta", {}).get("content")
+                    if content:
+                        self._add_output(usage, content)
+                        yield content
+                    if event.get("usage"):
+                        # Exact counts, if the server reports them
+                        usage.input_tokens = event["usage"].get("prompt_tokens", usage.input_tokens)
+                        usage.output_tokens = event["usage"].get("completion_tokens", usage.output_tokens)
+                        self._update_cost(usage)
+                    
+        except Exception as e:
+            raise Exception(f"CLOSED AI LLM stream failed: {str(e)}")
 
 class OpenAIClient(LLMClient):
     """Client for OpenAI models"""
     
     def __init__(self, model_id: str, api_key: Optional[str] = None):
         super().__init__(model_id)
+        if openai is None:
+            raise ImportError("OpenAI models require: pip install closedai[openai]")
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key required")
     
+    def _client(self) -> "openai.AsyncOpenAI":
+        """OpenAI client for the running event loop, on the SDK's connection pool"""
+        return self._loop_client(lambda: openai.AsyncOpenAI(
+            api_key=self.api_key,
+            http_client=httpx.AsyncClient(transport=_pooled_transport())
+        ))
+    
+    @staticmethod
+    async def _close_client(client: "openai.AsyncOpenAI"):
+        await client.close()
+    
     async def complete(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.7, **kwargs) -> LLMResponse:
         """Complete prompt using OpenAI"""
         try:
-            import openai
-            
-            client = openai.AsyncOpenAI(api_key=self.api_key)
-            response = await client.completions.create(
+            response = await self._client().completions.create(
                 model=self.model_id,
                 prompt=prompt,
                 max_tokens=max_tokens,
@@ -150,8 +325,9 @@ class OpenAIClient(LLMClient):
             content = response.choices[0].text
             input_tokens = response.usage.prompt_tokens
             output_tokens = response.usage.completion_tokens
+            details = getattr(response.usage, "prompt_tokens_details", None)
             
-            cost = calculate_llm_cost(self.model_id, input_tokens, output_tokens)
+            cost = calculate_llm_cost(self.model_id, input_tokens, output_tokens, pricing=self.pricing)
             
             return LLMResponse(
                 content=content,
@@ -159,7 +335,8 @@ class OpenAIClient(LLMClient):
                 output_tokens=output_tokens,
                 cost_usd=cost,
                 model_used=self.model_id,
-                finish_reason=response.choices[0].finish_reason
+                finish_reason=response.choices[0].finish_reason,
+                cached_tokens=getattr(details, "cached_tokens", None) or 0
             )
             
         except Exception as e:
@@ -168,10 +345,7 @@ class OpenAIClient(LLMClient):
     async def chat(self, messages: List[Dict[str, str]], max_tokens: int = 1000, temperature: float = 0.7, **kwargs) -> LLMResponse:
         """Chat completion using OpenAI"""
         try:
-            import openai
-            
-            client = openai.AsyncOpenAI(api_key=self.api_key)
-            response = await client.chat.completions.create(
+            response = await self._client().chat.completions.create(
                 model=self.model_id,
                 messages=messages,
                 max_tokens=max_tokens,
@@ -182,8 +356,9 @@ class OpenAIClient(LLMClient):
             content = response.choices[0].message.content
             input_tokens = response.usage.prompt_tokens
             output_tokens = response.usage.completion_tokens
+            details = getattr(response.usage, "prompt_tokens_details", None)
             
-            cost = calculate_llm_cost(self.model_id, input_tokens, output_tokens)
+            cost = calculate_llm_cost(self.model_id, input_tokens, output_tokens, pricing=self.pricing)
             
             return LLMResponse(
                 content=content,
@@ -191,28 +366,75 @@ class OpenAIClient(LLMClient):
                 output_tokens=output_tokens,
                 cost_usd=cost,
                 model_used=self.model_id,
-                finish_reason=response.choices[0].finish_reason
+                finish_reason=response.choices[0].finish_reason,
+                cached_tokens=getattr(details, "cached_tokens", None) or 0
             )
             
         except Exception as e:
             raise Exception(f"OpenAI chat failed: {str(e)}")
+    
+    async def stream(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        usage: Optional["StreamUsage"] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Stream a chat completion from OpenAI"""
+        try:
+            messages = self._stream_messages(prompt, messages)
+            usage = self._start_usage(usage, messages)
+            
+            chunks = await self._client().chat.completions.create(
+                model=self.model_id,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+                **{**kwargs, "stream_options": {"include_usage": True, **(kwargs.get("stream_options") or {})}}
+            )
+            
+            async for chunk in chunks:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    self._add_output(usage, chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+                if getattr(chunk, "usage", None):
+                    # The final chunk carries the exact counts
+                    usage.input_tokens = chunk.usage.prompt_tokens
+                    usage.output_tokens = chunk.usage.completion_tokens
+                    self._update_cost(usage)
+                    
+        except Exception as e:
+            raise Exception(f"OpenAI stream failed: {str(e)}")
 
 class AnthropicClient(LLMClient):
     """Client for Anthropic Claude models"""
     
     def __init__(self, model_id: str, api_key: Optional[str] = None):
         super().__init__(model_id)
+        if anthropic is None:
+            raise ImportError("Anthropic models require: pip install closedai[anthropic]")
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         if not self.api_key:
             raise ValueError("Anthropic API key required")
     
+    def _client(self) -> "anthropic.AsyncAnthropic":
+        """Anthropic client for the running event loop, on the SDK's connection pool"""
+        return self._loop_client(lambda: anthropic.AsyncAnthropic(
+            api_key=self.api_key,
+            http_client=httpx.AsyncClient(transport=_pooled_transport())
+        ))
+    
+    @staticmethod
+    async def _close_client(client: "anthropic.AsyncAnthropic"):
+        await client.close()
+    
     async def chat(self, messages: List[Dict[str, str]], max_tokens: int = 1000, temperature: float = 0.7, **kwargs) -> LLMResponse:
         """Chat completion using Claude"""
         try:
-            import anthropic
-            
-            client = anthropic.AsyncAnthropic(api_key=self.api_key)
-            response = await client.messages.create(
+            response = await self._client().messages.create(
                 model=self.model_id,
                 messages=messages,
                 max_tokens=max_tokens,
@@ -224,7 +446,7 @@ class AnthropicClient(LLMClient):
             input_tokens = response.usage.input_tokens
             output_tokens = response.usage.output_tokens
             
-            cost = calculate_llm_cost(self.model_id, input_tokens, output_tokens)
+            cost = calculate_llm_cost(self.model_id, input_tokens, output_tokens, pricing=self.pricing)
             
             return LLMResponse(
                 content=content,
@@ -232,34 +454,92 @@ class AnthropicClient(LLMClient):
                 output_tokens=output_tokens,
                 cost_usd=cost,
                 model_used=self.model_id,
-                finish_reason=response.stop_reason
+                finish_reason=response.stop_reason,
+                cached_tokens=getattr(response.usage, "cache_read_input_tokens", None) or 0
             )
             
         except Exception as e:
             raise Exception(f"Anthropic API call failed: {str(e)}")
+    
+    async def stream(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        usage: Optional["StreamUsage"] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Stream a chat completion from Claude"""
+        try:
+            messages = self._stream_messages(prompt, messages)
+            usage = self._start_usage(usage, messages)
+            
+            async with self._client().messages.stream(
+                model=self.model_id,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **kwargs
+            ) as response:
+                async for text in response.text_stream:
+                    self._add_output(usage, text)
+                    yield text
+                
+                # Exact counts from the finished message
+                final = await response.get_final_message()
+                usage.input_tokens = final.usage.input_tokens
+                usage.output_tokens = final.usage.output_tokens
+                self._update_cost(usage)
+                    
+        except Exception as e:
+            raise Exception(f"Anthropic stream failed: {str(e)}")
+
+# Gemini only knows "user" and "model" turns
+_GEMINI_ROLES = {"user": "user", "assistant": "model", "model": "model"}
+
+# Key genai is configured with; genai.configure is process-wide and resets
+# the SDK's cached clients, so it only runs when the key changes
+_genai_api_key: Optional[str] = None
 
 class GoogleClient(LLMClient):
     """Client for Google Gemini models"""
     
     def __init__(self, model_id: str, api_key: Optional[str] = None):
         super().__init__(model_id)
+        if genai is None:
+            raise ImportError("Google models require: pip install closedai[google]")
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
         if not self.api_key:
             raise ValueError("Google API key required")
     
+    def _configure(self):
+        global _genai_api_key
+        if _genai_api_key != self.api_key:
+            genai.configure(api_key=self.api_key)
+            _genai_api_key = self.api_key
+    
     async def chat(self, messages: List[Dict[str, str]], max_tokens: int = 1000, temperature: float = 0.7, **kwargs) -> LLMResponse:
         """Chat completion using Gemini"""
         try:
-            import google.generativeai as genai
-            
-            genai.configure(api_key=self.api_key)
-            model = genai.GenerativeModel(self.model_id)
+            self._configure()
             
-            # Convert messages to Gemini format
-            prompt = "\n".join([f"{msg['role']}: {msg['content']}" for msg in messages])
+            # Convert messages to Gemini's structured turns; system messages
+            # become the model's system instruction
+            system = [msg["content"] for msg in messages if msg["role"] == "system"]
+            contents = [
+                {"role": _GEMINI_ROLES.get(msg["role"], "user"), "parts": [{"text": msg["content"]}]}
+                for msg in messages
+                if msg["role"] != "system"
+            ]
+            # system_instruction is only accepted by google-generativeai 0.5+
+            model = genai.GenerativeModel(
+                self.model_id,
+                **({"system_instruction": "\n".join(system)} if system else {})
+            )
             
             response = await model.generate_content_async(
-                prompt,
+                contents,
                 generation_config=genai.GenerationConfig(
                     max_output_tokens=max_tokens,
                     temperature=temperature
@@ -268,11 +548,14 @@ class GoogleClient(LLMClient):
             
             content = response.text
             
-            # Estimate tokens (Gemini doesn't provide exact counts)
-            input_tokens = estimate_tokens(prompt)
-            output_tokens = estimate_tokens(content)
+            # Token counts as reported by Gemini, estimated if missing
+            usage = getattr(response, "usage_metadata", None)
+            input_tokens = getattr(usage, "prompt_token_count", None) or sum(
+                await asyncio.gather(*[estimate_tokens_async(msg["content"]) for msg in messages])
+            )
+            output_tokens = getattr(usage, "candidates_token_count", None) or await estimate_tokens_async(content)
             
-            cost = calculate_llm_cost(self.model_id, input_tokens, output_tokens)
+            cost = calculate_llm_cost(self.model_id, input_tokens, output_tokens, pricing=self.pricing)
             
             return LLMResponse(
                 content=content,
@@ -286,23 +569,56 @@ class GoogleClient(LLMClient):
         except Exception as e:
             raise Exception(f"Google API call failed: {str(e)}")
 
+# Client class for each provider named in the model registry
+_PROVIDER_REGISTRY: Dict[str, Type[LLMClient]] = {
+    "ClosedAI": ClosedAILLMClient,
+    "OpenAI": OpenAIClient,
+    "Anthropic": AnthropicClient,
+    "Google": GoogleClient
+}
+
+def register_provider(name: str):
+    """
+    Class decorator registering an LLMClient subclass for a provider name
+    
+        @register_provider("Mistral")
+        class MistralClient(LLMClient):
+            ...
+    """
+    def decorator(cls: Type[LLMClient]) -> Type[LLMClient]:
+        _PROVIDER_REGISTRY[name] = cls
+        return cls
+    return decorator
+
+# One client per model, so repeated calls share its provider clients and connection pool
+_CLIENT_CACHE: Dict[str, LLMClient] = {}
+
 def get_llm_client(model_id: str) -> LLMClient:
     """Get appropriate LLM client based on model ID"""
+    client = _CLIENT_CACHE.get(model_id)
+    if client is not None:
+        return client
+    
     llm_pricing = load_llm_pricing()
     model_info = llm_pricing.get(model_id, {})
     provider = model_info.get("provider", "ClosedAI")
     
-    if provider == "ClosedAI":
-        return ClosedAILLMClient(model_id)
-    elif provider == "OpenAI":
-        return OpenAIClient(model_id)
-    elif provider == "Anthropic":
-        return AnthropicClient(model_id)
-    elif provider == "Google":
-        return GoogleClient(model_id)
-    else:
-        # Default to ClosedAI for unknown providers
-        return ClosedAILLMClient(model_id)
+    # Default to ClosedAI for unknown providers
+    client = _PROVIDER_REGISTRY.get(provider, ClosedAILLMClient)(model_id)
+    _CLIENT_CACHE[model_id] = client
+    return client
+
+# Responses to deterministic (temperature 0) calls, least recently used first
+RESPONSE_CACHE_SIZE = 256
+_RESPONSE_CACHE: "OrderedDict[str, LLMResponse]" = OrderedDict()
+
+def _response_cache_key(*args: Any) -> Optional[str]:
+    """Cache key for a call, or None if its arguments aren't plain JSON"""
+    try:
+        return json.dumps(args, sort_keys=True)
+    except (TypeError, ValueError):
+        # Objects could collide through their str(), so such calls aren't cached
+        return None
 
 async def llm_call(
     model_id: str,
@@ -310,6 +626,7 @@ async def llm_call(
     messages: Optional[List[Dict[str, str]]] = None,
     max_tokens: int = 1000,
     temperature: float = 0.7,
+    cache: bool = False,
     **kwargs
 ) -> LLMResponse:
     """
@@ -321,29 +638,162 @@ async def llm_call(
         messages: Messages for chat models
         max_tokens: Maximum tokens to generate
         temperature: Temperature for sampling
+        cache: Whether a deterministic call may be answered from the cache
         **kwargs: Additional model-specific parameters
     
     Returns:
         LLMResponse with content and cost information
+    
+    With cache=True, a call with temperature 0 is deterministic, so an
+    identical earlier call's response is returned from an in-process cache
+    (with cost_usd 0). Calls whose kwargs aren't plain JSON are never cached.
     """
+    key = None
+    if cache and temperature == 0:
+        key = _response_cache_key(model_id, prompt, messages, max_tokens, kwargs)
+    if key is not None:
+        cached = _RESPONSE_CACHE.get(key)
+        if cached is not None:
+            _RESPONSE_CACHE.move_to_end(key)
+            return replace(cached, cost_usd=0.0)
+    
     client = get_llm_client(model_id)
     
     if messages:
-        return await client.chat(messages, max_tokens=max_tokens, temperature=temperature, **kwargs)
+        response = await client.chat(messages, max_tokens=max_tokens, temperature=temperature, **kwargs)
     elif prompt:
-        return await client.complete(prompt, max_tokens=max_tokens, temperature=temperature, **kwargs)
+        response = await client.complete(prompt, max_tokens=max_tokens, temperature=temperature, **kwargs)
     else:
         raise ValueError("Either prompt or messages must be provided")
+    
+    if key is not None:
+        _RESPONSE_CACHE[key] = response
+        if len(_RESPONSE_CACHE) > RESPONSE_CACHE_SIZE:
+            _RESPONSE_CACHE.popitem(last=False)
+    return response
+
+async def llm_stream(
+    model_id: str,
+    prompt: Optional[str] = None,
+    messages: Optional[List[Dict[str, str]]] = None,
+    max_tokens: int = 1000,
+    temperature: float = 0.7,
+    usage: Optional[StreamUsage] = None,
+    **kwargs
+) -> AsyncGenerator[str, None]:
+    """
+    Stream an LLM response as text chunks
+    
+    Same arguments as llm_call, but the text is yielded as it is generated.
+    Pass a StreamUsage to follow tokens and cost while it streams:
+    
+        usage = StreamUsage()
+        async for chunk in llm_stream("gpt-4o-mini", prompt="...", usage=usage):
+            print(chunk, end="")
+        print(usage.cost_usd)
+    """
+    client = get_llm_client(model_id)
+    async for chunk in client.stream(
+        prompt, messages, max_tokens=max_tokens, temperature=temperature, usage=usage, **kwargs
+    ):
+        yield chunk
+
+async def llm_call_many(requests: List[Dict[str, Any]], concurrency: int = 10) -> List[Any]:
+    """
+    Run several LLM calls concurrently, e.g. one prompt against several models
+    
+    Args:
+        requests: Keyword arguments for each llm_call
+        concurrency: Maximum number of calls in flight
+    
+    Returns:
+        One LLMResponse per request, in order; a failed call is returned as
+        its exception instead of failing the whole batch
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def one(request: Dict[str, Any]) -> LLMResponse:
+        async with semaphore:
+            return await llm_call(**request)
+    
+    return await asyncio.gather(*[one(request) for request in requests], return_exceptions=True)
+
+@functools.lru_cache(maxsize=32)
+def _get_encoding(model: str) -> Optional["tiktoken.Encoding"]:
+    """tiktoken encoding for a model, built once per model; None if it can't be loaded"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception as e:
+        # Offline (BPE download failed) or unknown model. The None is cached
+        # too, so estimates use the length fallback instead of retrying
+        logger.warning(f"Could not load tiktoken encoding for {model}, estimating tokens from length: {e}")
+        return None
+
+def _count_chunk_tokens(text: str) -> int:
+    """Tokens in a streamed chunk; not cached, chunks rarely repeat"""
+    encoding = _get_encoding("gpt-4")
+    try:
+        return len(encoding.encode(text))
+    except:
+        return max(1, len(text) // 4)
+
+# Token counts of recent texts, keyed by (model, digest of the text) so long
+# prompts aren't kept alive by the cache; remembers repeated system prompts
+TOKEN_COUNT_CACHE_SIZE = 4096
+_TOKEN_COUNTS: "OrderedDict[tuple, int]" = OrderedDict()
+_token_counts_lock = threading.Lock()
 
 def estimate_tokens(text: str, model: str = "gpt-4") -> int:
     """Estimate token count for text"""
+    encoding = _get_encoding(model) if len(text) >= 8 else None
+    if encoding is None:
+        # Not worth tokenizing (or a cache slot), or no encoding available
+        return max(1, len(text) // 4)
+    
+    key = (model, hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest())
+    with _token_counts_lock:
+        count = _TOKEN_COUNTS.get(key)
+        if count is not None:
+            _TOKEN_COUNTS.move_to_end(key)
+            return count
+    
     try:
         # Use tiktoken for accurate token counting
-        encoding = tiktoken.encoding_for_model(model)
-        return len(encoding.encode(text))
+        count = len(encoding.encode(text))
     except:
         # Fallback to character-based estimation
         return max(1, len(text) // 4)
+    
+    with _token_counts_lock:
+        _TOKEN_COUNTS[key] = count
+        if len(_TOKEN_COUNTS) > TOKEN_COUNT_CACHE_SIZE:
+            _TOKEN_COUNTS.popitem(last=False)
+    return count
+
+# Texts longer than this are tokenized on a worker thread by estimate_tokens_async
+TOKENIZE_INLINE_MAX_CHARS = 4096
+
+async def estimate_tokens_async(text: str, model: str = "gpt-4") -> int:
+    """
+    estimate_tokens for async code
+    
+    Long texts are encoded in the default executor; tiktoken releases the GIL
+    while encoding, so other coroutines keep running meanwhile.
+    """
+    if len(text) <= TOKENIZE_INLINE_MAX_CHARS:
+        return estimate_tokens(text, model)
+    return await asyncio.get_running_loop().run_in_executor(None, estimate_tokens, text, model)
+
+def estimate_tokens_batch(texts: List[str], model: str = "gpt-4") -> List[int]:
+    """Estimate token counts for several texts, encoding them in one batch"""
+    try:
+        encoding = _get_encoding(model)
+        return [len(tokens) for tokens in encoding.encode_batch(texts, num_threads=8)]
+    except:
+        # Fallback to character-based estimation
+        return [max(1, len(text) // 4) for text in texts]
 
 def get_model_pricing(model_id: str) -> Dict[str, Any]:
     """Get pricing information for a model"""
@@ -353,4 +803,16 @@ def get_model_pricing(model_id: str) -> Dict[str, Any]:
 def list_available_models() -> List[Dict[str, Any]]:
     """List all available models with pricing"""
     llm_pricing = load_llm_pricing()
-    return list(llm_pricing.values()) 
\ No newline at end of file
+    return list(llm_pricing.values())
+
+def prewarm_tokenizer(model: str = "gpt-4", background: bool = True):
+    """
+    Load a model's encoding ahead of the first token estimate
+    
+    The first estimate otherwise pays for the BPE download/parse. With
+    background, the encoding loads on a daemon thread and this returns at once.
+    """
+    if background:
+        threading.Thread(target=_get_encoding, args=(model,), name="closedai-tokenizer-prewarm", daemon=True).start()
+    else:
+        _get_encoding(model)
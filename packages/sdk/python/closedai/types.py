@@ -2,10 +2,15 @@
 Type definitions for CLOSED AI SDK
 """
 
+import sys
 from typing import Dict, Any, List, Optional, Union
 from dataclasses import dataclass
 from enum import Enum
 
+# dataclass(**SLOTS) drops the per-instance __dict__ where the interpreter
+# supports it (slots=True is Python 3.10+)
+SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 class GPUType(Enum):
     """Available GPU types"""
     CPU = "cpu"
@@ -45,7 +50,7 @@ class WidgetType(Enum):
     URL = "url"
     JSON_EDITOR = "json-editor"
 
-@dataclass
+@dataclass(frozen=True, **SLOTS)
 class ParameterValidation:
     """Parameter validation rules"""
     min: Optional[float] = None
@@ -55,7 +60,7 @@ class ParameterValidation:
     pattern: Optional[str] = None
     enum: Optional[List[Any]] = None
 
-@dataclass
+@dataclass(frozen=True, **SLOTS)
 class ParameterUI:
     """Parameter UI configuration"""
     widget: Optional[WidgetType] = None
@@ -74,7 +79,7 @@ class FlowParameter:
     validation: Optional[ParameterValidation] = None
     ui: Optional[ParameterUI] = None
 
-@dataclass
+@dataclass(frozen=True, **SLOTS)
 class FlowRuntime:
     """Flow runtime configuration"""
     image: str
@@ -83,7 +88,7 @@ class FlowRuntime:
     timeout: int = 300
     memory: int = 1024
 
-@dataclass
+@dataclass(frozen=True, **SLOTS)
 class FlowMeta:
     """Flow metadata"""
     author: str
@@ -93,7 +98,7 @@ class FlowMeta:
     repository: Optional[str] = None
     estimated_cost: Optional[Dict[str, float]] = None
 
-@dataclass
+@dataclass(frozen=True, **SLOTS)
 class FlowLLMConfig:
     """LLM configuration for flows"""
     default_model: Optional[str] = None
@@ -113,61 +118,31 @@ class FlowSpec:
     meta: Optional[FlowMeta] = None
     llm: Optional[FlowLLMConfig] = None
 
-class FlowInput:
+class FlowInput(dict):
     """Flow input container"""
     
-    def __init__(self, **kwargs):
-        self.data = kwargs
-    
-    def __getitem__(self, key):
-        return self.data[key]
-    
-    def __setitem__(self, key, value):
-        self.data[key] = value
-    
-    def get(self, key, default=None):
-        return self.data.get(key, default)
+    __slots__ = ()
     
-    def keys(self):
-        return self.data.keys()
-    
-    def values(self):
-        return self.data.values()
-    
-    def items(self):
-        return self.data.items()
+    @property
+    def data(self) -> Dict[str, Any]:
+        return self
     
     def to_dict(self) -> Dict[str, Any]:
-        return self.data.copy()
+        return dict(self)
 
-class FlowOutput:
+class FlowOutput(dict):
     """Flow output container"""
     
-    def __init__(self, **kwargs):
-        self.data = kwargs
-    
-    def __getitem__(self, key):
-        return self.data[key]
-    
-    def __setitem__(self, key, value):
-        self.data[key] = value
-    
-    def get(self, key, default=None):
-        return self.data.get(key, default)
+    __slots__ = ()
     
-    def keys(self):
-        return self.data.keys()
-    
-    def values(self):
-        return self.data.values()
-    
-    def items(self):
-        return self.data.items()
+    @property
+    def data(self) -> Dict[str, Any]:
+        return self
     
     def to_dict(self) -> Dict[str, Any]:
-        return self.data.copy()
+        return dict(self)
 
-@dataclass
+@dataclass(frozen=True, **SLOTS)
 class LLMModel:
     """LLM model information"""
     id: str
@@ -185,7 +160,7 @@ class LLMModel:
     quantization: Optional[str] = None
     status: str = "active"
 
-@dataclass
+@dataclass(frozen=True, **SLOTS)
 class CostEstimate:
     """Cost estimate for flow execution"""
     total_cost_usd: float
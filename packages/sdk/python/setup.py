@@ -35,16 +35,18 @@ setup(
     python_requires=">=3.8",
     install_requires=[
         "httpx>=0.24.0",
-        "tiktoken>=0.4.0",
         "pydantic>=2.0.0",
         "aiofiles>=23.0.0",
         "python-dotenv>=1.0.0",
     ],
     extras_require={
-        "openai": ["openai>=1.0.0"],
+        "openai": ["openai>=1.26.0"],
         "anthropic": ["anthropic>=0.3.0"],
         "google": ["google-generativeai>=0.3.0"],
         "modal": ["modal>=0.55.0"],
+        "orjson": ["orjson>=3.9.0"],
+        "http2": ["httpx[http2]>=0.24.0"],
+        "tokenize": ["tiktoken>=0.4.0"],
         "dev": [
             "pytest>=7.0.0",
             "pytest-asyncio>=0.21.0",
@@ -54,10 +56,13 @@ setup(
             "mypy>=1.0.0",
         ],
         "all": [
-            "openai>=1.0.0",
+            "openai>=1.26.0",
             "anthropic>=0.3.0",
             "google-generativeai>=0.3.0",
             "modal>=0.55.0",
+            "orjson>=3.9.0",
+            "httpx[http2]>=0.24.0",
+            "tiktoken>=0.4.0",
         ]
     },
     entry_points={
@@ -0,0 +1,94 @@
+-- Single-call writes for creating and forking flows
+-- Each function inserts the flow, its attribution row and any fork bookkeeping
+-- in one transaction, so the API makes one round trip per write.
+
+-- Create a flow from its JSON definition
+CREATE OR REPLACE FUNCTION create_flow(flow JSONB)
+RETURNS UUID AS $$
+DECLARE
+    new_id UUID;
+BEGIN
+    IF auth.uid() IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated';
+    END IF;
+
+    INSERT INTO flows (id, name, description, creator_id, inputs, outputs, runtime, version, is_public)
+    VALUES (
+        COALESCE((flow->>'id')::UUID, uuid_generate_v4()),
+        flow->>'name',
+        flow->>'description',
+        auth.uid(),
+        flow->'inputs',
+        flow->'outputs',
+        flow->'runtime',
+        COALESCE(flow->>'version', '1.0.0'),
+        COALESCE((flow->>'is_public')::BOOLEAN, FALSE)
+    )
+    RETURNING id INTO new_id;
+
+    INSERT INTO flow_attributions (flow_id, contributor_id, contribution_type, attribution_percentage)
+    VALUES (new_id, auth.uid(), 'original', 100.00);
+
+    RETURN new_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Fork a stored flow; the definition is copied in-database, so only the
+-- fork's own fields travel over the wire
+CREATE OR REPLACE FUNCTION fork_flow(original_id UUID, flow JSONB)
+RETURNS UUID AS $$
+DECLARE
+    original flows%ROWTYPE;
+    new_id UUID;
+BEGIN
+    IF auth.uid() IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated';
+    END IF;
+
+    SELECT * INTO original
+    FROM flows
+    WHERE id = original_id
+      AND (is_public = TRUE OR creator_id = auth.uid())
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Flow % not found', original_id;
+    END IF;
+
+    INSERT INTO flows (
+        id, name, description, category_id, creator_id,
+        original_flow_id, fork_generation,
+        inputs, outputs, runtime, version, is_public
+    )
+    VALUES (
+        COALESCE((flow->>'id')::UUID, uuid_generate_v4()),
+        COALESCE(flow->>'name', original.name),
+        COALESCE(flow->>'description', original.description),
+        original.category_id,
+        auth.uid(),
+        original.id,
+        original.fork_generation + 1,
+        original.inputs,
+        original.outputs,
+        original.runtime,
+        COALESCE(flow->>'version', original.version),
+        COALESCE((flow->>'is_public')::BOOLEAN, FALSE)
+    )
+    RETURNING id INTO new_id;
+
+    INSERT INTO flow_attributions (flow_id, contributor_id, contribution_type, attribution_percentage)
+    VALUES
+        (new_id, original.creator_id, 'original', 100.00),
+        (new_id, auth.uid(), 'fork', 0.00);
+
+    UPDATE flows
+    SET fork_count = fork_count + 1,
+        updated_at = NOW()
+    WHERE id = original.id;
+
+    RETURN new_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+GRANT EXECUTE ON FUNCTION create_flow(JSONB) TO authenticated;
+GRANT EXECUTE ON FUNCTION fork_flow(UUID, JSONB) TO authenticated;
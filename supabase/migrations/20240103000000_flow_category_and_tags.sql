@@ -0,0 +1,124 @@
+-- Persist each flow's category and tags, so stored flows match the API's catalog
+
+ALTER TABLE flows ADD COLUMN tags TEXT[] NOT NULL DEFAULT '{}';
+
+-- Category id for a category name, adding the category if it is new
+CREATE OR REPLACE FUNCTION flow_category_id(category_name TEXT)
+RETURNS UUID AS $$
+DECLARE
+    found_id UUID;
+BEGIN
+    IF category_name IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO categories (name) VALUES (category_name)
+    ON CONFLICT (name) DO NOTHING;
+
+    SELECT id INTO found_id FROM categories WHERE name = category_name;
+    RETURN found_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Tags of a flow's JSON definition, or NULL if it has none
+CREATE OR REPLACE FUNCTION flow_tags(flow JSONB)
+RETURNS TEXT[] AS $$
+    SELECT CASE
+        WHEN jsonb_typeof(flow->'tags') = 'array'
+        THEN ARRAY(SELECT jsonb_array_elements_text(flow->'tags'))
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Create a flow from its JSON definition
+CREATE OR REPLACE FUNCTION create_flow(flow JSONB)
+RETURNS UUID AS $$
+DECLARE
+    new_id UUID;
+BEGIN
+    IF auth.uid() IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated';
+    END IF;
+
+    INSERT INTO flows (id, name, description, category_id, tags, creator_id, inputs, outputs, runtime, version, is_public)
+    VALUES (
+        COALESCE((flow->>'id')::UUID, uuid_generate_v4()),
+        flow->>'name',
+        flow->>'description',
+        flow_category_id(flow->>'category'),
+        COALESCE(flow_tags(flow), '{}'),
+        auth.uid(),
+        flow->'inputs',
+        flow->'outputs',
+        flow->'runtime',
+        COALESCE(flow->>'version', '1.0.0'),
+        COALESCE((flow->>'is_public')::BOOLEAN, FALSE)
+    )
+    RETURNING id INTO new_id;
+
+    INSERT INTO flow_attributions (flow_id, contributor_id, contribution_type, attribution_percentage)
+    VALUES (new_id, auth.uid(), 'original', 100.00);
+
+    RETURN new_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Fork a stored flow; the definition is copied in-database, so only the
+-- fork's own fields travel over the wire
+CREATE OR REPLACE FUNCTION fork_flow(original_id UUID, flow JSONB)
+RETURNS UUID AS $$
+DECLARE
+    original flows%ROWTYPE;
+    new_id UUID;
+BEGIN
+    IF auth.uid() IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated';
+    END IF;
+
+    SELECT * INTO original
+    FROM flows
+    WHERE id = original_id
+      AND (is_public = TRUE OR creator_id = auth.uid())
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Flow % not found', original_id;
+    END IF;
+
+    INSERT INTO flows (
+        id, name, description, category_id, tags, creator_id,
+        original_flow_id, fork_generation,
+        inputs, outputs, runtime, version, is_public
+    )
+    VALUES (
+        COALESCE((flow->>'id')::UUID, uuid_generate_v4()),
+        COALESCE(flow->>'name', original.name),
+        COALESCE(flow->>'description', original.description),
+        COALESCE(flow_category_id(flow->>'category'), original.category_id),
+        COALESCE(flow_tags(flow), original.tags),
+        auth.uid(),
+        original.id,
+        original.fork_generation + 1,
+        original.inputs,
+        original.outputs,
+        original.runtime,
+        COALESCE(flow->>'version', original.version),
+        COALESCE((flow->>'is_public')::BOOLEAN, FALSE)
+    )
+    RETURNING id INTO new_id;
+
+    INSERT INTO flow_attributions (flow_id, contributor_id, contribution_type, attribution_percentage)
+    VALUES
+        (new_id, original.creator_id, 'original', 100.00),
+        (new_id, auth.uid(), 'fork', 0.00);
+
+    UPDATE flows
+    SET fork_count = fork_count + 1,
+        updated_at = NOW()
+    WHERE id = original.id;
+
+    RETURN new_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Only the write functions above may add categories
+REVOKE EXECUTE ON FUNCTION flow_category_id(TEXT) FROM PUBLIC, anon, authenticated;